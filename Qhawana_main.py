@@ -1,16 +1,33 @@
 import PyQt6.QtCore
+import array
+import base64
+import bisect
+import collections
+import concurrent.futures
+import copy
+import datetime
 import exiftool
+import exiftool.exceptions
 import av
+import functools
 import gzip
 import hashlib
+import io
+import itertools
 import PIL.Image
-import PIL.ImageQt
+import PIL.ImageOps
 import os
 import json
+import re
 import mimetypes
+import multiprocessing
 import qtmodern.styles
+import sqlite3
 import sys
+import threading
+import time
 import traceback
+import zipfile
 from enum import IntEnum
 
 from PyQt6 import QtCore, QtGui, QtMultimedia, QtWidgets, QtMultimediaWidgets
@@ -21,6 +38,48 @@ from ui_multiVisionShow import Ui_Form_multiVisionShow
 MV_ICON_SIZE = 100
 MV_PREVIEW_SIZE = 800
 BUF_SIZE = 65536
+MV_INGEST_WORKERS = os.cpu_count() or 1
+MV_METADATA_PROCESSES = 1
+MV_METADATA_BATCH_SIZE = 32
+# Metadata tags kept with every scene, all other tags are read from the source file when they are needed
+MV_EXIF_TAGS = ("File:FileName", "EXIF:CreateDate", "EXIF:SubSecTimeDigitized", "EXIF:OffsetTimeDigitized",
+                "QuickTime:CreateDate", "EXIF:Orientation", "EXIF:Model")
+# Date tags for the capture time of a scene, in order of preference, with their sub-second and time zone tags
+MV_CAPTURE_TIME_TAGS = (("EXIF:CreateDate", "EXIF:SubSecTimeDigitized", "EXIF:OffsetTimeDigitized"),
+                        ("QuickTime:CreateDate", None, None))
+MV_METADATA_CACHE_SIZE = 64
+MV_THUMBNAIL_CACHE_SIZE = 1024 * 1024 * 1024
+MV_HASH_MODE = 0  # Hash_Mode.SHA1
+MV_VERIFY_MODE = 1  # Verify_Mode.QUICK
+MV_HASH_MEMO_SIZE = 100000
+MV_QUICK_ID_SIZE = 1024 * 1024
+MV_VIDEO_PROBE_MEMO_SIZE = 32
+MV_EMBEDDED_PREVIEWS = True
+MV_COMMIT_BATCH_SIZE = 256
+MV_COMMIT_INTERVAL = 200  # ms
+MV_WATCH_DEBOUNCE = 1000  # ms
+MV_WATCH_SETTLE_TIME = 2000  # ms
+MV_PROJECT_SUFFIX = ".qhawana"
+MV_LEGACY_PROJECT_SUFFIX = ".pmv"
+MV_DATABASE_SUFFIX = ".qhawanadb"
+MV_DATABASE_BATCH_SIZE = 1024
+MV_PROJECT_FORMAT_VERSION = 1
+MV_ICON_PREFETCH_WORKERS = 2
+MV_PREFETCH_LIMIT = 200
+MV_LOAD_WORKERS = os.cpu_count() or 1
+MV_LOAD_CHUNK_SIZE = 1024 * 1024
+MV_SCENES_MIME_TYPE = "application/x-qhawana-scenes"
+MV_SCENES_FORMAT_VERSION = 2
+MV_UNDO_LIMIT = 1000
+MV_STATUS_MESSAGE_TIMEOUT = 5000  # ms
+# Fields of the search index that can be named in a filter query, words without a field are searched in all of them
+MV_SEARCH_FIELDS = ("name", "camera", "notes", "audio")
+MV_FILTER_DELAY = 200  # ms
+MV_JOURNAL_SUFFIX = ".journal"
+MV_JOURNAL_FLUSH_INTERVAL = 1000  # ms
+MV_JOURNAL_COMPACT_RECORDS = 1000
+MV_JOURNAL_COMPACT_INTERVAL = 10 * 60 * 1000  # ms
+MV_SOURCE_HASH_ROLE = QtCore.Qt.ItemDataRole.UserRole + 1
 
 
 class Scene_Type(IntEnum):
@@ -29,6 +88,19 @@ class Scene_Type(IntEnum):
     VIDEO = 2
 
 
+class Hash_Mode(IntEnum):
+    SHA1 = 0
+    BLAKE2 = 1
+    QUICK = 2
+
+
+class Verify_Mode(IntEnum):
+    # How the media files of a project are verified against their stored hashes when it is loaded
+    TRUST = 0
+    QUICK = 1
+    FULL = 2
+
+
 class Show_States(IntEnum):
     STOPPED = 0
     RUNNING = 1
@@ -81,6 +153,7 @@ class Mv_Project(QtCore.QObject):
         self.show = Mv_Show()
         self.bin = ProjectBinModel()
         self.settings = ProjectSettings()
+        self.ingest_index = IngestIndex()
 
     def clear_bin(self):
         self.bin.clear()
@@ -97,11 +170,19 @@ class Mv_Project(QtCore.QObject):
 
 class Mv_Show(QtCore.QObject):
     state_changed = PyQt6.QtCore.pyqtSignal(str)
+    scenes_cleared = PyQt6.QtCore.pyqtSignal()
+    scenes_loaded = PyQt6.QtCore.pyqtSignal(list)
+    scenes_pending = PyQt6.QtCore.pyqtSignal(object)
 
     def __init__(self):
         super().__init__()
         self.sequence = Mv_sequence(parent=self)
         self.__state = Show_States.STOPPED
+        # Scenes are loaded off the GUI thread and appended to the sequence in the thread that owns it, after the
+        # sequence has been cleared there
+        self.scenes_cleared.connect(self.sequence.clear)
+        self.scenes_loaded.connect(self.sequence.appendScenes)
+        self.scenes_pending.connect(self.sequence.setFetcher)
 
     def state(self):
         return self.__state
@@ -122,25 +203,77 @@ class Mv_Show(QtCore.QObject):
     def length(self):
         return self.sequence.rowCount()
 
-    def toJson(self, progress_callback):
+    def snapshot(self) -> list:
+        # Taken in the GUI thread, so the show can be serialised in the background while it is edited
+        self.sequence.fetchAll()
+        return [SceneSnapshot(self.sequence.item(i)) for i in range(self.sequence.rowCount())]
+
+    def toJson(self, snapshot: list, progress_callback):
         scenes = []
-        num_scenes = self.sequence.rowCount()
-        for i in range(num_scenes):
-            item = self.sequence.item(i)
+        num_scenes = len(snapshot)
+        for i, item in enumerate(snapshot):
             scene_data = item.toJson(store_pixmap=True)
             scenes.append(scene_data)
-            progress_callback.emit((i + 1) // num_scenes * 100)
-        json_string = {"scenes": scenes}
+            progress_callback.emit((i + 1) * 100 // num_scenes)
+        json_string = {"scene_count": num_scenes, "scenes": scenes}
+        return json_string
+
+    def toArchive(self, snapshot: list, archive: zipfile.ZipFile, progress_callback):
+        # Renditions are stored as separate entries next to the manifest instead of base64 in the JSON
+        scenes = []
+        num_scenes = len(snapshot)
+        for i, item in enumerate(snapshot):
+            scene_data = item.toJson()
+            name = item.uuid.toString(QtCore.QUuid.StringFormat.WithoutBraces)
+            for key, size in (("preview", MV_PREVIEW_SIZE), ("icon", MV_ICON_SIZE)):
+                encoded = item.encoded(size)
+                if encoded is not None:
+                    data, extension = encoded
+                    scene_data[key] = f"{key}s/{name}.{extension}"
+                    # Images are compressed already, so they are stored as they are
+                    archive.writestr(scene_data[key], data, compress_type=zipfile.ZIP_STORED)
+            scenes.append(scene_data)
+            progress_callback.emit((i + 1) * 100 // num_scenes)
+        json_string = {"scene_count": num_scenes, "scenes": scenes}
         return json_string
 
-    def fromJson(self, json_string: dict, progress_callback):
-        self.sequence.clear()
+    def fetchFrom(self, store):
+        # The sequence fetches the scenes of a project database in batches, as the views show them
+        self.set_state(Show_States.STOPPED)
+        self.scenes_pending.emit(functools.partial(self.fetchScenes, store))
+
+    def fetchScenes(self, store, count: int) -> list:
+        return [Mv_Scene.fromJson(record, store).data() for record in store.fetchScenes(count)]
+
+    def fromJson(self, json_string, progress_callback, archive=None, progress=None) -> list:
+        # json_string may be any iterable of scene dicts, e.g. the scenes of a project file as they are read.
+        # Scenes are built on a thread pool and appended to the sequence in batches, in their original order.
+        self.scenes_cleared.emit()
         self.set_state(Show_States.STOPPED)
-        num_scenes = len(json_string)
-        for i, s in enumerate(json_string):
-            progress_callback.emit((i + 1) // num_scenes * 100)
-            scene = Mv_Scene.fromJson(s)
-            self.sequence.appendRow(scene)
+        if progress is None:
+            num_scenes = len(json_string)
+            progress = lambda i: (i + 1) * 100 // num_scenes
+
+        loaded = []
+        batch = CommitBatch(self.scenes_loaded.emit)
+        pending = collections.deque()
+        scenes = iter(json_string)
+        percent = 0
+        with concurrent.futures.ThreadPoolExecutor(MV_LOAD_WORKERS) as executor:
+            while True:
+                # Keep a few scenes per worker in flight, so the file is not read much further ahead than needed
+                for s in itertools.islice(scenes, MV_LOAD_WORKERS * 4 - len(pending)):
+                    pending.append(executor.submit(Mv_Scene.fromJson, s, archive))
+                if not pending:
+                    break
+                item = pending.popleft().result()
+                loaded.append(item.data())
+                batch.add(item)
+                if progress(len(loaded) - 1) != percent:
+                    percent = progress(len(loaded) - 1)
+                    progress_callback.emit(percent)
+        batch.flush()
+        return loaded
 
     def getModel(self):
         return self.sequence
@@ -150,129 +283,196 @@ class Mv_Show(QtCore.QObject):
 
 
 class Mv_sequence(QtCore.QAbstractTableModel):
-    # sequence is a list of QStandardItems with UUIDs referring to a Mv_Scene object
-    _sequence = []
-
-    # scenes is a dict of Mv_Scene objects with a UUID as the key
-    _scenes = {}
+    # Emitted from the icon loader threads with the scene's UUID and the decoded icon
+    icon_loaded = QtCore.pyqtSignal(object, object)
 
-    # horizontal_headers is a list of strings
-    _horizontal_headers = []
+    # Emitted with a record of each edit, so it can be written to the project journal
+    edited = QtCore.pyqtSignal(dict)
 
     def __init__(self, parent=None):
         super().__init__()
+        # scenes is a list of slots holding Mv_Scene objects, slots maps the UUID of a scene to its slot
+        self._scenes = []
+        self._slots = {}
+        self._free_slots = []
+        # sequence is an array of the slots of the scenes in the order of the rows, -1 for an empty row
+        self._sequence = array.array('l')
+        # rows maps the UUID of a scene to its row, it is rebuilt when it is needed after rows were moved
+        self._rows = {}
+        # display holds the display texts of the columns for each slot, until the scene in the slot changes
+        self._display = []
+        # UUIDs of the scenes that were added or changed since the project was last saved to its database
+        self._dirty = set()
+        # Returns the next scenes of a show that is fetched in batches from a project database, see fetchMore
+        self._fetch = None
+        self.fetching = False
+
+        self._horizontal_headers = []
         self.setHorizontalHeaderLabels(["Visual source", "Audio source", "Capture Time",
                                         "Duration", "In Point", "Out Point"])
+        self._icon_requests = set()
+        self.icon_loaded.connect(self.setLoadedIcon)
+        # Edits made in the views are pushed to the undo stack as commands, see SceneEditCommand
+        self.undo_stack = QtGui.QUndoStack(self)
+        self.undo_stack.setUndoLimit(MV_UNDO_LIMIT)
 
     def data(self, index, role=...):
-        if not (index.isValid() and index.row() <= self.rowCount()):
+        if not (index.isValid() and index.row() < self.rowCount()):
             QtCore.qWarning("Invalid index for sequence")
             return False
-        item: QtGui.QStandardItem = self._sequence[index.row()]
-        item_uuid = item.data(QtCore.Qt.ItemDataRole.UserRole)
-        if item_uuid is None or item_uuid.isNull():
-            # This happens when data() is requested for an empty item
-            QtCore.qWarning(f"Item {index.row()} in sequence does not have a valid UUID")
-            return False
-        if item_uuid not in self._scenes:
-            QtCore.qWarning(f"Scene for item in sequence with UUID {item_uuid} not found")
-            return False
-        item_data: Mv_Scene = self._scenes[item_uuid]
-        if item_data is None:
-            QtCore.qWarning(f"Scene for item in sequence with UUID {item_uuid} is empty")
+        slot = self._sequence[index.row()]
+        if slot < 0:
+            # This happens when data() is requested for an empty row
+            QtCore.qWarning(f"Item {index.row()} in sequence does not have a scene")
             return False
+        item_data: Mv_Scene = self._scenes[slot]
         if role == QtCore.Qt.ItemDataRole.UserRole:
             return item_data
+        elif role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return self.displayValues(slot)[index.column()]
         elif index.column() == 0:
-            if role == QtCore.Qt.ItemDataRole.DisplayRole:
-                if item_data.exif:
-                    return item_data.exif["File:FileName"]
-                else:
-                    return item_data.source
-            elif role == QtCore.Qt.ItemDataRole.DecorationRole:
+            if role == QtCore.Qt.ItemDataRole.DecorationRole:
+                if item_data.icon is None:
+                    # Icons of scenes loaded from a project are decoded in the background when they are shown
+                    self.prefetchIcons(index.row(), index.row())
                 return item_data.icon
         elif index.column() == 1:
-            if role == QtCore.Qt.ItemDataRole.DisplayRole or role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            if role == QtCore.Qt.ItemDataRole.ToolTipRole:
                 return item_data.audio_source
-        elif index.column() == 2:
-            if role == QtCore.Qt.ItemDataRole.DisplayRole:
-                if item_data.exif:
-                    if "EXIF:CreateDate" in item_data.exif:
-                        return item_data.exif["EXIF:CreateDate"]
-                    elif "QuickTime:CreateDate" in item_data.exif:
-                        return item_data.exif["QuickTime:CreateDate"]
         elif index.column() == 3:
-            if role == QtCore.Qt.ItemDataRole.DisplayRole:
-                if item_data.duration > 0:
-                    return timeStringFromMsec(item_data.duration)
-                elif item_data.duration == 0:
-                    return "(stop)"
-                elif item_data.duration == -1:
-                    return "(default)"
-            elif role == QtCore.Qt.ItemDataRole.SizeHintRole:
+            if role == QtCore.Qt.ItemDataRole.SizeHintRole:
                 return "0000:00:00 00:00:00"
         elif index.column() in [4, 5] and item_data.scene_type == Scene_Type.STILL:
-            if role == QtCore.Qt.ItemDataRole.DisplayRole:
-                return ""
-            elif role == QtCore.Qt.ItemDataRole.SizeHintRole:
+            if role == QtCore.Qt.ItemDataRole.SizeHintRole:
                 return "000:00.000"
-        elif (index.column() == 4 and
-              role == QtCore.Qt.ItemDataRole.DisplayRole):
-            return timeStringFromMsec(item_data.in_point)
         elif (index.column() == 4 and
               role == QtCore.Qt.ItemDataRole.EditRole):
             return str(item_data.in_point)
-        elif (index.column() == 5 and
-              role == QtCore.Qt.ItemDataRole.DisplayRole):
-            return timeStringFromMsec(item_data.out_point)
         elif (index.column() == 5 and
               role == QtCore.Qt.ItemDataRole.EditRole):
             return str(item_data.out_point)
 
+    def displayValues(self, slot: int) -> tuple:
+        # The texts are computed when a scene is first shown and cached until the scene is changed
+        values = self._display[slot]
+        if values is None:
+            scene: Mv_Scene = self._scenes[slot]
+            capture_time = None
+            if scene.exif:
+                capture_time = scene.exif.get("EXIF:CreateDate") or scene.exif.get("QuickTime:CreateDate")
+            duration = None
+            if scene.duration > 0:
+                duration = timeStringFromMsec(scene.duration)
+            elif scene.duration == 0:
+                duration = "(stop)"
+            elif scene.duration == -1:
+                duration = "(default)"
+            if scene.scene_type == Scene_Type.STILL:
+                in_point = out_point = ""
+            else:
+                in_point = timeStringFromMsec(scene.in_point)
+                out_point = timeStringFromMsec(scene.out_point)
+            values = ((scene.exif or {}).get("File:FileName") or scene.source, scene.audio_source, capture_time,
+                      duration, in_point, out_point)
+            self._display[slot] = values
+        return values
+
+    def displayText(self, row: int, column: int) -> str:
+        slot = self._sequence[row]
+        return str(self.displayValues(slot)[column] or "") if slot >= 0 else ""
+
     def setData(self, index, value, role=...):
         if role == QtCore.Qt.ItemDataRole.EditRole and index.column() in [4, 5]:
-            item = self._sequence[index.row()]
-            item_uuid = item.data(QtCore.Qt.ItemDataRole.UserRole)
-            if item_uuid is None or item_uuid.isNull():
-                QtCore.qWarning(f"Item {index.row()} in sequence does not have a valid UUID")
+            item_data: Mv_Scene = self.item(index.row())
+            if not item_data:
                 return False
-            if item_uuid not in self._scenes:
-                QtCore.qWarning(f"Scene for item in sequence with UUID {item_uuid} not found")
-                return False
-            item_data: Mv_Scene = self._scenes[item_uuid]
 
             if int(value) > item_data.duration or int(value) < 0:
                 return False
             if index.column() == 4:
                 if int(value) < item_data.out_point:
-                    item_data.in_point = int(value)
+                    self.editScenes("Change in point", [(item_data, {"in_point": int(value)})])
                 else:
                     return False
             elif index.column() == 5:
                 if int(value) > item_data.in_point:
-                    item_data.out_point = int(value)
+                    self.editScenes("Change out point", [(item_data, {"out_point": int(value)})])
                 else:
                     return False
 
-            self.dataChanged.emit(index, index)
             return True
         else:
             return super().setData(index, value, role)
 
     def clear(self):
+        self.undo_stack.clear()
         self.beginResetModel()
-        self._sequence = []
-        self._scenes = {}
+        self._scenes = []
+        self._slots = {}
+        self._free_slots = []
+        self._sequence = array.array('l')
+        self._rows = {}
+        self._display = []
+        self._dirty = set()
+        self._fetch = None
+        self._icon_requests = set()
         self.endResetModel()
         return True
 
+    def setFetcher(self, fetch):
+        # fetch(count) returns up to count more scenes of the show, they are appended when the views need them
+        self.clear()
+        self._fetch = fetch
+        self.fetchMore()
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return self._fetch is not None and not parent.isValid()
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if self._fetch is None or parent.isValid():
+            return
+        scenes = self._fetch(MV_DATABASE_BATCH_SIZE)
+        if len(scenes) < MV_DATABASE_BATCH_SIZE:
+            self._fetch = None
+        if not scenes:
+            return
+        # Fetched scenes are neither edits nor changes of the project
+        row = len(self._sequence)
+        self.fetching = True
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + len(scenes) - 1)
+        self._sequence.extend(self.storeScene(scene) for scene in scenes)
+        if self._rows is not None:
+            self._rows.update((scene.uuid, row + i) for i, scene in enumerate(scenes))
+        self.endInsertRows()
+        self.fetching = False
+
+    def fetchAll(self):
+        # Edits that add, remove or move rows and everything else that needs all scenes of the show fetch the rest first
+        while self._fetch is not None:
+            self.fetchMore()
+
+    def rebindRenditions(self, archive, new_archive):
+        # The renditions of the scenes are read from the project file the show has been saved to
+        for scene in self._scenes:
+            if scene is not None and scene.renditions is not None and scene.renditions.archive is archive:
+                scene.renditions.archive = new_archive
+
+    def sceneOrder(self) -> list[str]:
+        return [self._scenes[slot].uuid.toString(QtCore.QUuid.StringFormat.WithoutBraces)
+                for slot in self._sequence if slot >= 0]
+
+    def takeDirtyScenes(self) -> set:
+        # The scenes are dirty again, if the save they are taken for fails
+        dirty = self._dirty
+        self._dirty = set()
+        return dirty
+
+    def markDirty(self, scene_uuids):
+        self._dirty.update(scene_uuids)
+
     def deleteScene(self, index):
         if index.isValid():
-            self.beginRemoveRows(self.index(index.row(), 0), index.row(), index.row())
-            item = self._sequence.pop(index.row())
-            del self._scenes[item.data(QtCore.Qt.ItemDataRole.UserRole)]
-            self.endRemoveRows()
-            return True
+            return self.removeScenes([index.row()])
         else:
             return False
 
@@ -292,14 +492,33 @@ class Mv_sequence(QtCore.QAbstractTableModel):
         return len(self._sequence)
 
     def appendRow(self, item: QtGui.QStandardItem):
-        length = self.rowCount()
-        self.beginInsertRows(self.index(self.rowCount() - 1, 0), length, length)
-        scene = item.data()
-        self._scenes[scene.uuid] = scene
-        item.setData(scene.uuid, QtCore.Qt.ItemDataRole.UserRole)
-        self._sequence.append(item)
+        self.appendScenes([item])
+
+    def appendScenes(self, items: list[QtGui.QStandardItem]):
+        self.insertScenes(self.endRow(), items)
+
+    def endRow(self) -> int:
+        # The row after the last scene of the show, the scenes that have not been fetched yet come before it
+        self.fetchAll()
+        return self.rowCount()
+
+    def insertScenes(self, row: int, items: list[QtGui.QStandardItem]):
+        self.applyInsert(row, [item.data() for item in items])
+
+    def applyInsert(self, row: int, scenes: list):
+        if not scenes:
+            return
+        self.fetchAll()
+        self._dirty.update(scene.uuid for scene in scenes)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + len(scenes) - 1)
+        slots = array.array('l', (self.storeScene(scene) for scene in scenes))
+        if row == len(self._sequence) and self._rows is not None:
+            self._rows.update((scene.uuid, row + i) for i, scene in enumerate(scenes))
+        else:
+            self._rows = None
+        self._sequence[row:row] = slots
         self.endInsertRows()
-        self.rowsInserted.emit(QtCore.QModelIndex(), length, length)
+        self.edited.emit({"op": "insert", "row": row, "scenes": [scene.toJson() for scene in scenes]})
 
     def setHorizontalHeaderLabels(self, labels):
         self._horizontal_headers.clear()
@@ -309,21 +528,124 @@ class Mv_sequence(QtCore.QAbstractTableModel):
 
     def item(self, row, column=0):
         try:
-            item = self._sequence[row]
+            slot = self._sequence[row]
         except IndexError:
             QtCore.qWarning(f"Sequence item index is out of bounds "
                             f"(Item {row} requested, sequence has {self.rowCount()} items)")
             return False
-        item_uuid = item.data(QtCore.Qt.ItemDataRole.UserRole)
-        if item_uuid is None or item_uuid.isNull():
-            QtCore.qWarning("Item in sequence does not have a valid UUID")
-            return False
-        if item_uuid not in self._scenes:
-            QtCore.qWarning(f"Scene for item in sequence with UUID {item_uuid} not found")
+        if slot < 0:
+            QtCore.qWarning(f"Item {row} in sequence does not have a scene")
             return False
 
-        return self._scenes[item_uuid]
-        # return self.data(self.index(row, column), QtCore.Qt.ItemDataRole.UserRole)
+        return self._scenes[slot]
+
+    def sceneByUuid(self, scene_uuid: QtCore.QUuid):
+        slot = self._slots.get(scene_uuid)
+        return self._scenes[slot] if slot is not None else None
+
+    def sceneCount(self) -> int:
+        return len(self._slots)
+
+    def storeScene(self, scene) -> int:
+        # Scenes that are already stored keep their slot, e.g. when a scene is inserted again
+        slot = self._slots.get(scene.uuid)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            else:
+                slot = len(self._scenes)
+                self._scenes.append(None)
+                self._display.append(None)
+            self._slots[scene.uuid] = slot
+        self._scenes[slot] = scene
+        self._display[slot] = None
+        return slot
+
+    def releaseSlots(self, slots):
+        # Scenes are only released when no other row refers to them, because moved rows are inserted before
+        # the rows they are moved from are removed
+        rows = self.rowIndex()
+        for slot in slots:
+            scene = self._scenes[slot] if slot >= 0 else None
+            if scene is not None and scene.uuid not in rows:
+                del self._slots[scene.uuid]
+                self._scenes[slot] = None
+                self._display[slot] = None
+                self._free_slots.append(slot)
+
+    def rowIndex(self) -> dict:
+        if self._rows is None:
+            scenes = self._scenes
+            self._rows = {scenes[slot].uuid: row for row, slot in enumerate(self._sequence) if slot >= 0}
+        return self._rows
+
+    def rowOfScene(self, scene_uuid: QtCore.QUuid) -> int:
+        return self.rowIndex().get(scene_uuid, -1)
+
+    def editScenes(self, text: str, changes: list):
+        # Changes are given as (scene, values) tuples, only the values that actually change are kept for undo
+        deltas = []
+        for scene, values in changes:
+            values = {name: value for name, value in values.items() if getattr(scene, name) != value}
+            if values:
+                deltas.append((scene.uuid, {name: getattr(scene, name) for name in values}, values))
+        if deltas:
+            self.undo_stack.push(SceneEditCommand(self, text, deltas))
+
+    def applySceneValues(self, changes: list):
+        for scene_uuid, values in changes:
+            scene = self.sceneByUuid(scene_uuid)
+            if scene is None:
+                QtCore.qWarning(f"Scene with UUID {scene_uuid.toString()} not found in sequence")
+                continue
+            for name, value in values.items():
+                setattr(scene, name, value)
+            self.sceneEdited(scene, *values)
+
+    def sceneChanged(self, scene):
+        # Scenes are changed in place, so their cached texts are dropped and the views update their row
+        slot = self._slots.get(scene.uuid)
+        if slot is None:
+            return
+        self._dirty.add(scene.uuid)
+        self._display[slot] = None
+        row = self.rowOfScene(scene.uuid)
+        if row >= 0:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def sceneEdited(self, scene, *names: str):
+        # Records the current values of the given properties of a scene
+        self.sceneChanged(scene)
+        self.edited.emit({"op": "set", "uuid": scene.uuid.toString(QtCore.QUuid.StringFormat.WithoutBraces),
+                          "values": {name: getattr(scene, name) for name in names}})
+
+    def prefetchIcons(self, first: int, last: int):
+        # Decodes the icons of a range of rows in the background, so they are ready when the rows are shown
+        for row in range(max(0, first), min(last, self.rowCount() - 1) + 1):
+            scene = self.item(row)
+            if not scene or scene.icon is not None or scene.renditions is None or scene.uuid in self._icon_requests:
+                continue
+            self._icon_requests.add(scene.uuid)
+            future = icon_loader.submit(scene.renditions.icon)
+            future.add_done_callback(
+                lambda f, scene_uuid=scene.uuid: self.icon_loaded.emit(scene_uuid,
+                                                                       None if f.exception() else f.result()))
+
+    def setLoadedIcon(self, scene_uuid: QtCore.QUuid, image: QtGui.QImage | None):
+        self._icon_requests.discard(scene_uuid)
+        scene = self.sceneByUuid(scene_uuid)
+        if scene is None or scene.icon is not None or image is None:
+            return
+
+        scene.setIconPixmap(QtGui.QPixmap().fromImage(image))
+        row = self.rowOfScene(scene_uuid)
+        if row >= 0:
+            changed_index = self.index(row, 0)
+            self.dataChanged.emit(changed_index, changed_index, [QtCore.Qt.ItemDataRole.DecorationRole])
+
+    def rowsOfScenes(self, scene_uuids) -> dict:
+        rows = self.rowIndex()
+        return {scene_uuid: rows[scene_uuid] for scene_uuid in scene_uuids if scene_uuid in rows}
 
     def supportedDragActions(self):
         return QtCore.Qt.DropAction.MoveAction
@@ -332,21 +654,141 @@ class Mv_sequence(QtCore.QAbstractTableModel):
         return QtCore.Qt.DropAction.MoveAction | QtCore.Qt.DropAction.CopyAction | QtCore.Qt.DropAction.LinkAction
 
     def insertRows(self, row, count, parent=...):
+        self.fetchAll()
         self.beginInsertRows(parent, row, row + count - 1)
-        for r in range(count):
-            QtCore.qInfo(f"inserting row after {row}")
-            self._sequence.insert(row, QtGui.QStandardItem())
+        QtCore.qInfo(f"inserting {count} rows after {row}")
+        self._sequence[row:row] = array.array('l', [-1] * count)
+        self._rows = None
         self.endInsertRows()
         return True
 
+    def insertSceneRows(self, row: int, scene_uuids: list[QtCore.QUuid], parent=QtCore.QModelIndex()):
+        # Inserts other rows for scenes of the sequence, the rows they are moved from are removed separately
+        self.fetchAll()
+        slots = array.array('l')
+        for scene_uuid in scene_uuids:
+            slot = self._slots.get(scene_uuid)
+            if slot is None:
+                QtCore.qWarning(f"Scene with UUID {scene_uuid.toString()} not found in sequence")
+                continue
+            slots.append(slot)
+        if not slots:
+            return
+        self.beginInsertRows(parent, row, row + len(slots) - 1)
+        self._sequence[row:row] = slots
+        self._rows = None
+        self.endInsertRows()
+        self.edited.emit({"op": "insert", "row": row,
+                          "uuids": [self._scenes[slot].uuid.toString(QtCore.QUuid.StringFormat.WithoutBraces)
+                                    for slot in slots]})
+
     def removeRows(self, row, count, parent=...):
+        self.fetchAll()
         self.beginRemoveRows(parent, row, row + count - 1)
-        for r in range(count):
-            QtCore.qInfo(f"deleting row {row}")
-            del self._sequence[row]
+        QtCore.qInfo(f"deleting {count} rows from row {row}")
+        slots = self._sequence[row:row + count]
+        del self._sequence[row:row + count]
+        self._rows = None
+        self.releaseSlots(slots)
         self.endRemoveRows()
+        self.edited.emit({"op": "remove", "row": row, "count": count})
+        return True
+
+    def removeScenes(self, rows: list[int], text="Delete scenes") -> bool:
+        rows = sorted({row for row in rows if 0 <= row < self.rowCount()})
+        if not rows:
+            return False
+        self.undo_stack.push(RemoveScenesCommand(self, rows, text))
+        return True
+
+    def applyRemove(self, rows: list[int]) -> list:
+        # Each contiguous range of rows is removed at once, from the last range to the first, so the rows of the
+        # other ranges stay valid. Returns the removed scenes in the order of the rows.
+        self.fetchAll()
+        QtCore.qInfo(f"deleting {len(rows)} rows")
+        ranges = []
+        for first, last in reversed(rowRanges(rows)):
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            ranges.append(self._sequence[first:last + 1])
+            del self._sequence[first:last + 1]
+            self._rows = None
+            self.endRemoveRows()
+        slots = [slot for removed in reversed(ranges) for slot in removed]
+        scenes = [self._scenes[slot] for slot in slots]
+        self.releaseSlots(slots)
+        self.edited.emit({"op": "remove", "rows": list(rows)})
+        return scenes
+
+    def restoreScenes(self, rows: list[int], scenes: list):
+        # Inserts removed scenes at their rows again, from the first range to the last
+        i = 0
+        for first, last in rowRanges(rows):
+            self.applyInsert(first, scenes[i:i + last - first + 1])
+            i += last - first + 1
+
+    def moveRows(self, sourceParent, sourceRow, count, destinationParent, destinationChild):
+        self.fetchAll()
+        if not self.beginMoveRows(sourceParent, sourceRow, sourceRow + count - 1,
+                                  destinationParent, destinationChild):
+            return False
+        slots = self._sequence[sourceRow:sourceRow + count]
+        del self._sequence[sourceRow:sourceRow + count]
+        row = destinationChild - count if destinationChild > sourceRow else destinationChild
+        self._sequence[row:row] = slots
+        self._rows = None
+        self.endMoveRows()
+        self.edited.emit({"op": "move", "rows": list(range(sourceRow, sourceRow + count)), "row": destinationChild})
+        return True
+
+    def moveScenes(self, rows: list[int], destination: int) -> bool:
+        # Moves the rows in front of the destination row, keeping their order
+        self.fetchAll()
+        rows = sorted({row for row in rows if 0 <= row < self.rowCount()})
+        destination = max(0, min(destination, self.rowCount()))
+        if not rows:
+            return False
+        if rows[-1] - rows[0] + 1 == len(rows) and rows[0] <= destination <= rows[-1] + 1:
+            return False
+        self.undo_stack.push(MoveScenesCommand(self, rows, destination))
         return True
 
+    def applyMove(self, rows: list[int], destination: int):
+        self.fetchAll()
+        if rows[-1] - rows[0] + 1 == len(rows):
+            self.moveRows(QtCore.QModelIndex(), rows[0], len(rows), QtCore.QModelIndex(), destination)
+            return
+
+        # Rows that are not contiguous are moved in a single layout change
+        self.reorderRows(self.moveOrder(rows, destination))
+        self.edited.emit({"op": "move", "rows": list(rows), "row": destination})
+
+    def moveOrder(self, rows: list[int], destination: int) -> list[int]:
+        # The rows of the sequence in their order after the move
+        moved = set(rows)
+        return ([row for row in range(destination) if row not in moved] + list(rows) +
+                [row for row in range(destination, self.rowCount()) if row not in moved])
+
+    def applyOrder(self, rows, hint=QtCore.QAbstractItemModel.LayoutChangeHint.NoLayoutChangeHint, record=None):
+        self.reorderRows(rows, hint)
+        self.edited.emit(record if record is not None else {"op": "reorder", "rows": list(rows)})
+
+    def reorderRows(self, rows: list[int], hint=QtCore.QAbstractItemModel.LayoutChangeHint.NoLayoutChangeHint):
+        # The rows are moved in a layout change, so the views keep their selection and scroll position.
+        # Rows that were appended after the order was taken, e.g. by an ingest, stay at the end.
+        if len(rows) < len(self._sequence):
+            rows = list(rows) + list(range(len(rows), len(self._sequence)))
+        self.layoutAboutToBeChanged.emit([], hint)
+        sequence = self._sequence
+        self._sequence = array.array('l', (sequence[row] for row in rows))
+        self._rows = None
+        new_rows = [0] * len(rows)
+        for new_row, row in enumerate(rows):
+            new_rows[row] = new_row
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [self.index(new_rows[index.row()], index.column())
+                                                    for index in persistent])
+        self.layoutChanged.emit([], hint)
+
     def mimeTypes(self):
         types = super().mimeTypes()
         types.append("x-application-Qhawana-STILLS")
@@ -365,10 +807,9 @@ class Mv_sequence(QtCore.QAbstractTableModel):
 
         for index in indexes:
             if index.isValid() and len(types) > 0 and index.column() == 0:
-                item: QtGui.QStandardItem = self._sequence[index.row()]
-                item_uuid = item.data(QtCore.Qt.ItemDataRole.UserRole)
-
-                stream << item_uuid
+                scene = self.item(index.row())
+                if scene:
+                    stream << scene.uuid
 
         mime_data.setData(format_type, encoded)
 
@@ -394,13 +835,16 @@ class Mv_sequence(QtCore.QAbstractTableModel):
             stream = QtCore.QDataStream(encoded, QtCore.QDataStream.OpenModeFlag.ReadOnly)
 
             # otherwise insert new rows for the data
-            item_uuid = QtCore.QUuid()
+            scene_uuids = []
             while not stream.atEnd():
+                item_uuid = QtCore.QUuid()
                 stream >> item_uuid
-                self.insertRow(row, parent)
-                QtCore.qDebug(f"Setting UUID {item_uuid.toString()} for inserted item in row {row}")
-                self._sequence[row].setData(item_uuid, QtCore.Qt.ItemDataRole.UserRole)
-                self.setData(self.index(row, column, parent), item_uuid, QtCore.Qt.ItemDataRole.UserRole)
+                scene_uuids.append(item_uuid)
+            # Scenes are dragged between the views of the sequence, so the drop is an undoable move of their rows.
+            # The views drop them as a copy, so the dragged rows are not removed afterwards.
+            rows = self.rowsOfScenes(scene_uuids)
+            QtCore.qDebug(f"Moving {len(rows)} scenes to row {row}")
+            self.moveScenes(list(rows.values()), row if row >= 0 else self.endRow())
             return True
 
         elif data.hasFormat('x-application-Qhawana-STILLS'):
@@ -415,12 +859,10 @@ class Mv_sequence(QtCore.QAbstractTableModel):
 
             item = stream.readQString()
 
-            scene_uuid = self._sequence[row].data(QtCore.Qt.ItemDataRole.UserRole)
-            scene = self._scenes[scene_uuid]
-            scene.audio_source = item
-
-            changed_index = self.index(row, column)
-            self.dataChanged.emit(changed_index, changed_index)
+            scene = self.item(row)
+            if not scene:
+                return False
+            self.editScenes("Set audio source", [(scene, {"audio_source": item})])
 
             return True
         else:
@@ -441,46 +883,127 @@ class Mv_sequence(QtCore.QAbstractTableModel):
         return flags
 
     def sort(self, column, order=...):
-        rev = (order == QtCore.Qt.SortOrder.DescendingOrder)
-        self.beginResetModel()
-        self._sequence.sort(key=lambda x: self.dataFromItemAndColumn(x, column), reverse=rev)
-        self.endResetModel()
+        if column not in (0, 2):
+            QtCore.qDebug(f"No sort key available for column {column}")
+            return
 
-    def dataFromItemAndColumn(self, sort_item: QtGui.QStandardItem, column: int) -> str:
-        item_uuid = sort_item.data(QtCore.Qt.ItemDataRole.UserRole)
+        self.fetchAll()
+        rev = (order == QtCore.Qt.SortOrder.DescendingOrder)
+        # Python's sort is stable in both directions, so scenes with equal keys keep their order
+        keys = [self.sortKey(self._scenes[slot], column) for slot in self._sequence]
+        rows = sorted(range(len(keys)), key=keys.__getitem__, reverse=rev)
+        if rows != list(range(len(rows))):
+            self.undo_stack.push(SortScenesCommand(self, rows, column, rev))
 
-        scene: Mv_Scene = self._scenes[item_uuid]
+    def sortKey(self, scene, column: int) -> tuple:
         if column == 0:
-            return scene.source
-        elif column == 2:
-            if scene.exif:
-                if "EXIF:CreateDate" in scene.exif:
-                    return scene.exif["EXIF:CreateDate"]
-                elif "QuickTime:CreateDate" in scene.exif:
-                    return scene.exif["QuickTime:CreateDate"]
-
-        QtCore.qDebug(f"No sort key available for column {column} of scene {item_uuid}")
-        return "0"
+            return scene.source,
+        # Scenes without a capture time come first, like scenes with an empty date string
+        return scene.capture_time is not None, scene.capture_time or 0, scene.source
 
     def inheritAudio(self, selection: list[QtCore.QModelIndex]):
         QtCore.qDebug(f"Received {selection} of {len(selection)} rows")
         selection.sort(key=lambda x: x.row())
         audio_source = self.item(selection[0].row()).audio_source
         if audio_source:
-            for i in selection:
-                QtCore.qDebug(f"Setting audio source {audio_source} to scene {i.row()}")
-                self.item(i.row()).audio_source = audio_source
+            QtCore.qDebug(f"Setting audio source {audio_source} to {len(selection) - 1} scenes")
+            self.editScenes("Inherit audio", [(self.item(i.row()), {"audio_source": audio_source})
+                                              for i in selection[1:]])
+
+
+class SceneEditCommand(QtGui.QUndoCommand):
+    # Keeps the old and the new values of the changed properties of scenes, as (UUID, old, new) tuples
+    def __init__(self, sequence: Mv_sequence, text: str, deltas: list):
+        super().__init__(text)
+        self.sequence = sequence
+        self.deltas = deltas
+
+    def redo(self):
+        self.sequence.applySceneValues([(scene_uuid, new) for scene_uuid, old, new in self.deltas])
+
+    def undo(self):
+        self.sequence.applySceneValues([(scene_uuid, old) for scene_uuid, old, new in self.deltas])
+
+
+class InsertScenesCommand(QtGui.QUndoCommand):
+    # The scenes are only kept until they are inserted, while the insert is undone their states are kept instead
+    def __init__(self, sequence: Mv_sequence, row: int, scenes: list, text="Insert scenes"):
+        super().__init__(text)
+        self.sequence = sequence
+        self.row = row
+        self.count = len(scenes)
+        self.scenes = scenes
+        self.states = []
+
+    def redo(self):
+        scenes = self.scenes if self.scenes is not None else restoreSceneStates(self.states)
+        self.scenes = None
+        self.states = []
+        self.sequence.applyInsert(self.row, scenes)
+
+    def undo(self):
+        self.states = sceneStates(self.sequence.applyRemove(range(self.row, self.row + self.count)))
+
+
+class RemoveScenesCommand(QtGui.QUndoCommand):
+    # The states of the removed scenes are kept, so they can be inserted again without holding their pixmaps
+    def __init__(self, sequence: Mv_sequence, rows: list[int], text="Delete scenes"):
+        super().__init__(text)
+        self.sequence = sequence
+        self.rows = array.array('I', rows)
+        self.states = []
+
+    def redo(self):
+        self.states = sceneStates(self.sequence.applyRemove(self.rows))
+
+    def undo(self):
+        self.sequence.restoreScenes(self.rows, restoreSceneStates(self.states))
+        self.states = []
+
+
+class MoveScenesCommand(QtGui.QUndoCommand):
+    # Only the moved rows and the destination are kept, the order is restored from the inverse permutation
+    def __init__(self, sequence: Mv_sequence, rows: list[int], destination: int, text="Move scenes"):
+        super().__init__(text)
+        self.sequence = sequence
+        self.rows = array.array('I', rows)
+        self.destination = destination
+
+    def redo(self):
+        self.sequence.applyMove(self.rows, self.destination)
+
+    def undo(self):
+        self.sequence.applyOrder(inversePermutation(self.sequence.moveOrder(self.rows, self.destination)))
+
+
+class SortScenesCommand(QtGui.QUndoCommand):
+    # Keeps the permutation of the rows, which is all that is needed to restore their order
+    def __init__(self, sequence: Mv_sequence, rows: list[int], column: int, reverse: bool, text="Sort scenes"):
+        super().__init__(text)
+        self.sequence = sequence
+        self.rows = array.array('I', rows)
+        self.record = {"op": "sort", "column": column, "order": int(reverse)}
+
+    def redo(self):
+        self.sequence.applyOrder(self.rows, QtCore.QAbstractItemModel.LayoutChangeHint.VerticalSortHint,
+                                 self.record)
+
+    def undo(self):
+        self.sequence.applyOrder(inversePermutation(self.rows),
+                                 QtCore.QAbstractItemModel.LayoutChangeHint.VerticalSortHint)
 
 
 class Mv_Scene(QtGui.QStandardItem):
     def __init__(self, source: str, scene_type: Scene_Type, audio_source="", pause=False, duration=-1,
-                 in_point=-1, out_point=-1, play_video_audio=False, pixmap=None, notes="", exif=None):
+                 in_point=-1, out_point=-1, play_video_audio=False, pixmap=None, notes="", exif=None,
+                 source_hash="", audio_source_hash="", icon_pixmap=None, compute_hashes=True, uuid=None,
+                 renditions=None):
 
-        self.uuid = QtCore.QUuid().createUuid()
+        self.uuid = uuid if uuid is not None else QtCore.QUuid().createUuid()
         self.source = source
-        self.source_hash = ""
+        self.source_hash = source_hash
         self.audio_source = audio_source
-        self.audio_source_hash = ""
+        self.audio_source_hash = audio_source_hash
         self.scene_type = scene_type
         self.pause = pause
         self.duration = duration
@@ -490,73 +1013,77 @@ class Mv_Scene(QtGui.QStandardItem):
         self.pixmap = pixmap
         self.notes = notes
         self.exif = exif
+        # Parsed from the EXIF dates once, scenes are sorted by this instead of the date strings
+        self.capture_time = captureTime(exif)
+        # Scenes loaded from a project decode their pixmap and icon on demand from this SceneRenditions handle
+        self.renditions = renditions
 
-        if self.source:
-            file_sha1 = hashlib.sha1()
+        # Hashes that have already been computed (e.g. by the ingest pipeline) are not computed again
+        if compute_hashes and self.source and not self.source_hash:
             try:
-                with open(self.source, 'rb') as f:
-                    while True:
-                        data = f.read(BUF_SIZE)
-                        if not data:
-                            break
-                        file_sha1.update(data)
+                self.source_hash = hash_memo.fileHash(self.source)
             except FileNotFoundError:
                 QtCore.qWarning(f"Source file {self.source} not found for scene {self.uuid.toString()}")
-                pass
-            else:
-                self.source_hash = file_sha1.hexdigest()
 
-        if self.audio_source:
-            file_sha1 = hashlib.sha1()
+        if compute_hashes and self.audio_source and not self.audio_source_hash:
             try:
-                with open(self.audio_source, 'rb') as f:
-                    while True:
-                        data = f.read(BUF_SIZE)
-                        if not data:
-                            break
-                        file_sha1.update(data)
+                self.audio_source_hash = hash_memo.fileHash(self.audio_source)
             except FileNotFoundError:
                 QtCore.qWarning(f"Audio source file {self.audio_source} not found for scene {self.uuid.toString()}")
-                pass
-            else:
-                self.audio_source_hash = file_sha1.hexdigest()
 
-        self.icon = QtGui.QIcon()
-        self.icon.addPixmap(self.pixmap.scaled(MV_ICON_SIZE, MV_ICON_SIZE,
-                                               QtCore.Qt.AspectRatioMode.KeepAspectRatio,
-                                               QtCore.Qt.TransformationMode.SmoothTransformation),
-                            QtGui.QIcon.Mode.Normal,
-                            QtGui.QIcon.State.Off)
+        if icon_pixmap is None and self.pixmap:
+            icon_pixmap = self.pixmap.scaled(MV_ICON_SIZE, MV_ICON_SIZE,
+                                             QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                                             QtCore.Qt.TransformationMode.SmoothTransformation)
+        self.icon = None
+        if icon_pixmap is not None:
+            self.setIconPixmap(icon_pixmap)
 
         super().__init__()
 
+    def setIconPixmap(self, icon_pixmap: QtGui.QPixmap):
+        self.icon = QtGui.QIcon()
+        self.icon.addPixmap(icon_pixmap, QtGui.QIcon.Mode.Normal, QtGui.QIcon.State.Off)
+
+    def fullExif(self) -> dict | None:
+        # Scenes only keep the tags in MV_EXIF_TAGS, the complete metadata is read from the source on demand
+        if not self.source:
+            return None
+        return readFullMetadata(self.source, self.source_hash)
+
     def __getstate__(self):
-        state = [self.uuid, self.source, self.audio_source, self.scene_type,
-                 self.pause, self.duration, self.notes, self.exif]
-        byte_array = QtCore.QByteArray()
-        stream = QtCore.QDataStream(byte_array, QtCore.QIODevice.OpenModeFlag.WriteOnly)
-        stream << self.pixmap
-        state.append(byte_array)
+        # Plain values only, so the state can be written to the clipboard field by field
+        state = [self.uuid.toString(QtCore.QUuid.StringFormat.WithoutBraces), self.source, self.audio_source,
+                 int(self.scene_type), bool(self.pause), self.duration, self.notes, self.exif]
+        buf = QtCore.QBuffer()
+        getPixmapFromScene(self).save(buf, "PNG")
+        state.append(bytes(buf.data()))
+        # Appended after the pixmap, so states without them can still be read
+        state += [self.source_hash, self.audio_source_hash, self.in_point, self.out_point, self.play_video_audio]
         # QtCore.qDebug(f"Serialized Mv_Scene: {state}")
         return state
 
     def __setstate__(self, state):
-        self.uuid = state[0]
+        self.uuid = QtCore.QUuid(state[0])
         self.source = state[1]
         self.audio_source = state[2]
-        self.scene_type = state[3]
+        self.scene_type = Scene_Type(state[3])
         self.pause = state[4]
         self.duration = state[5]
         self.notes = state[6]
         self.exif = state[7]
+        self.capture_time = captureTime(self.exif)
         self.pixmap = QtGui.QPixmap()
-        stream = QtCore.QDataStream(state[8], QtCore.QIODevice.OpenModeFlag.ReadOnly)
-        stream >> self.pixmap
+        self.pixmap.loadFromData(state[8], "PNG")
+        if len(state) > 9:
+            (self.source_hash, self.audio_source_hash, self.in_point, self.out_point,
+             self.play_video_audio) = state[9:14]
         # self.pixmap = QtGui.QPixmap(self.source)
         # self.pixmap = None
 
     def toJson(self, store_pixmap=False) -> dict:
-        json_dict = {"source": self.source,
+        json_dict = {"uuid": self.uuid.toString(QtCore.QUuid.StringFormat.WithoutBraces),
+                     "source": self.source,
                      "source_hash": self.source_hash,
                      "audio_source": self.audio_source,
                      "audio_source_hash": self.audio_source_hash,
@@ -568,45 +1095,49 @@ class Mv_Scene(QtGui.QStandardItem):
                      "play_video_audio": self.play_video_audio,
                      "notes": self.notes,
                      "exif": self.exif}
-        if store_pixmap and self.pixmap:
-            json_dict["pixmap"] = jsonValFromPixmap(self.pixmap)
+        if store_pixmap:
+            json_dict["pixmap"] = jsonValFromPixmap(getPixmapFromScene(self))
         else:
             json_dict["pixmap"] = None
 
         return json_dict
 
-    def fromJson(json_dict: dict) -> QtGui.QStandardItem:
-        if "pixmap" in json_dict and json_dict["pixmap"]:
-            pixmap = pixmapFromJsonVal(json_dict["pixmap"])
-        else:
-            if json_dict["scene_type"] == Scene_Type.VIDEO:
-                keyframe_image = getKeyframeFromVideo(json_dict["source"])
-                pixmap = QtGui.QPixmap().fromImage(keyframe_image)
-            elif json_dict["scene_type"] == Scene_Type.STILL:
-                pixmap = QtGui.QPixmap(json_dict["source"])
-            else:
-                pixmap = QtGui.QPixmap(100, 100)
-                pixmap.fill(QtGui.QColor("black"))
-        icon = QtGui.QIcon()
-        icon.addPixmap(pixmap.scaled(MV_ICON_SIZE, MV_ICON_SIZE,
-                                     QtCore.Qt.AspectRatioMode.KeepAspectRatio,
-                                     QtCore.Qt.TransformationMode.SmoothTransformation),
-                       QtGui.QIcon.Mode.Normal,
-                       QtGui.QIcon.State.Off)
+    def fromState(state: list) -> QtGui.QStandardItem:
+        # Builds a copy of a scene from its state, e.g. when it is pasted. The copy gets a UUID of its own.
+        scene = Mv_Scene(source=state[1], scene_type=Scene_Type(state[3]), compute_hashes=False)
+        scene.__setstate__(state)
+        scene.uuid = QtCore.QUuid.createUuid()
+        if not scene.pixmap.isNull():
+            scene.setIconPixmap(scene.pixmap.scaled(MV_ICON_SIZE, MV_ICON_SIZE,
+                                                    QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                                                    QtCore.Qt.TransformationMode.SmoothTransformation))
+
+        item = QtGui.QStandardItem(scene.source)
+        item.setDropEnabled(False)
+        item.setData(scene)
+        return item
 
+    def fromJson(json_dict: dict, archive=None) -> QtGui.QStandardItem:
+        # Nothing is decoded here, the renditions are loaded when a view needs them
+        renditions = SceneRenditions(json_dict["source"], json_dict["scene_type"], json_dict.get("source_hash", ""),
+                                     archive=archive,
+                                     preview_entry=json_dict.get("preview", ""),
+                                     icon_entry=json_dict.get("icon", ""),
+                                     embedded_preview=base64.b64decode(json_dict.get("pixmap") or ""))
+
+        # Stored hashes are trusted here, the media files are verified in the background once the project is open
         scene = Mv_Scene(source=json_dict["source"],
                          scene_type=json_dict["scene_type"],
-                         pixmap=pixmap.scaled(MV_PREVIEW_SIZE, MV_PREVIEW_SIZE,
-                                              QtCore.Qt.AspectRatioMode.KeepAspectRatio,
-                                              QtCore.Qt.TransformationMode.SmoothTransformation)
-                         )
+                         compute_hashes=False,
+                         uuid=QtCore.QUuid(json_dict["uuid"]) if "uuid" in json_dict else None,
+                         renditions=renditions)
 
         if "play_video_audio" in json_dict:
             scene.play_video_audio = json_dict["play_video_audio"]
         elif scene.scene_type == Scene_Type.VIDEO:
-            with av.open(scene.source) as container:
-                # Set scene's play_video_audio property to True if the video has an audio stream:
-                scene.play_video_audio = (len(container.streams.audio) > 0)
+            probe = getVideoProbe(scene.source, keyframe=False)
+            # Set scene's play_video_audio property to True if the video has an audio stream:
+            scene.play_video_audio = probe is not None and probe.has_audio
         if "audio_source" in json_dict:
             scene.audio_source = json_dict["audio_source"]
         if "pause" in json_dict:
@@ -620,23 +1151,54 @@ class Mv_Scene(QtGui.QStandardItem):
         if "notes" in json_dict:
             scene.notes = json_dict["notes"]
         if "exif" in json_dict:
-            scene.exif = json_dict["exif"]
+            # Projects saved with the complete metadata of their scenes are reduced to the kept tags
+            scene.exif = compactExif(json_dict["exif"])
+            scene.capture_time = captureTime(scene.exif)
         if "source_hash" in json_dict:
             scene.source_hash = json_dict["source_hash"]
         if "audio_source_hash" in json_dict:
             scene.audio_source_hash = json_dict["audio_source_hash"]
 
-        item = QtGui.QStandardItem(icon, json_dict["source"])
+        item = QtGui.QStandardItem(json_dict["source"])
         item.setDropEnabled(False)
         item.setData(scene)
         return item
 
 
+def sceneStates(scenes: list) -> list:
+    # Records of scenes that are not in the sequence, with their renditions handle to decode them from again
+    return [(scene.toJson(), scene.renditions) for scene in scenes]
+
+
+def restoreSceneStates(states: list) -> list:
+    scenes = []
+    for record, renditions in states:
+        scene = Mv_Scene.fromJson(record).data()
+        if renditions is not None:
+            scene.renditions = renditions
+        scenes.append(scene)
+    return scenes
+
+
 class FilmStripWidget(QtWidgets.QListView):
-    pass
     # def __init__(self, parent=None):
     #    super(FilmStripWidget, self).__init__(parent)
 
+    def dropEvent(self, e):
+        if e.source() is self:
+            # Internal moves are a single move of the selected scenes in front of the scene they are dropped on
+            index = self.indexAt(e.position().toPoint())
+            destination = index.row() if index.isValid() else self.model().endRow()
+            self.model().moveScenes(selectedRows(self), destination)
+            # The scenes have been moved already, so the view must not remove the dragged rows
+            e.setDropAction(QtCore.Qt.DropAction.CopyAction)
+            e.accept()
+        else:
+            super().dropEvent(e)
+            if isinstance(e.source(), QtWidgets.QAbstractItemView) and sourceModelOf(e.source()) is self.model():
+                # Scenes dragged from the scene table are moved by the model, the table must not remove them
+                e.setDropAction(QtCore.Qt.DropAction.CopyAction)
+
 
 class FilmStripItemDelegate(QtWidgets.QStyledItemDelegate):
     def __init__(self, parent=None):
@@ -671,15 +1233,26 @@ class SceneTableWidget(QtWidgets.QTableView):
 
     def contextMenuEvent(self, e):
         handled = False
-        index = self.indexAt(e.pos())
+        index = sourceIndex(self.indexAt(e.pos()))
+        sequence = sourceModelOf(self)
 
         menu = QtWidgets.QMenu()
         # dummy = QtGui.QAction("Dummy action", menu) # default action for all columns
 
         if index.column() == 0:
-            action_1 = QtGui.QAction("Delete scene", menu)
-            action_1.triggered.connect(lambda x: self.model().deleteScene(index))
+            # Actions apply to all selected scenes, if the scene under the cursor is one of them
+            rows = selectedRows(self)
+            if index.row() not in rows:
+                rows = [index.row()]
+            action_1 = QtGui.QAction("Delete scene" if len(rows) == 1 else f"Delete {len(rows)} scenes", menu)
+            action_1.triggered.connect(lambda x: sequence.removeScenes(rows))
             menu.addAction(action_1)
+            action_3 = QtGui.QAction("Move to start", menu)
+            action_3.triggered.connect(lambda x: sequence.moveScenes(rows, 0))
+            menu.addAction(action_3)
+            action_4 = QtGui.QAction("Move to end", menu)
+            action_4.triggered.connect(lambda x: sequence.moveScenes(rows, sequence.endRow()))
+            menu.addAction(action_4)
             handled = True
         elif index.column() == 1:
             action_2 = QtGui.QAction("Inherit audio from above", menu)
@@ -687,14 +1260,16 @@ class SceneTableWidget(QtWidgets.QTableView):
             item_selection = self.selectionModel().selection()
             for selected_index in item_selection.indexes():
                 if selected_index.column() == 0:
-                    selected_rows.append(selected_index)
+                    selected_rows.append(sourceIndex(selected_index))
             if len(selected_rows) > 1:
-                action_2.triggered.connect(lambda x: self.model().inheritAudio(selected_rows))
+                action_2.triggered.connect(lambda x: sequence.inheritAudio(selected_rows))
                 menu.addAction(action_2)
             handled = True
 
         if handled:
             menu.addSeparator()
+            # Clipboard actions of the main window
+            menu.addActions(self.actions())
             # menu.addAction(dummy)
             menu.exec(e.globalPos())
             e.accept()
@@ -704,9 +1279,23 @@ class SceneTableWidget(QtWidgets.QTableView):
     def dropEvent(self, e):
         if e.source() is self:
             QtCore.qDebug("Internal move")
+            # Rows are moved in the sequence, also when the table only shows the scenes matching a filter
+            sequence = sourceModelOf(self)
+            index = sourceIndex(self.indexAt(e.position().toPoint()))
+            position = self.dropIndicatorPosition()
+            if not index.isValid() or position == QtWidgets.QAbstractItemView.DropIndicatorPosition.OnViewport:
+                destination = sequence.endRow()
+            elif position == QtWidgets.QAbstractItemView.DropIndicatorPosition.BelowItem:
+                destination = index.row() + 1
+            else:
+                destination = index.row()
+            sequence.moveScenes(selectedRows(self), destination)
+            # The scenes have been moved already, so the view must not remove the dragged rows
+            e.setDropAction(QtCore.Qt.DropAction.CopyAction)
+            e.accept()
         else:
             QtCore.qDebug("External drop")
-        super().dropEvent(e)
+            super().dropEvent(e)
 
     def dragEnterEvent(self, e):
         if e.source() is self:
@@ -817,8 +1406,11 @@ class ProjectBinWidget(QtWidgets.QTreeView):
 
 
 class ProjectBinModel(QtGui.QStandardItemModel):
+    files_added = QtCore.pyqtSignal(str, list)
+
     def __init__(self, parent=None):
         QtGui.QStandardItemModel.__init__(self, parent)
+        self._tooltips = {}
 
     def supportedDropActions(self):
         return QtCore.Qt.DropAction.IgnoreAction
@@ -862,54 +1454,112 @@ class ProjectBinModel(QtGui.QStandardItemModel):
     def toJson(self, progress_callback):
         items = {}
 
-        for index, data in forEach(self):
-            items[data] = []
-            if index:
-                for i, d in forEach(self, index):
-                    items[data].append(d)
+        # Categories are keyed by their name, they do not have any user data
+        for r in range(self.rowCount()):
+            category_item = self.item(r)
+            items[category_item.text()] = [d for i, d in forEach(self, category_item.index())]
 
         json_string = {"project_bin": items}
         return json_string
 
-    def fromJson(self, json_string: dict):
+    def appendFiles(self, category: str, paths: list[str]):
+        items = []
+        for path in paths:
+            bin_item = QtGui.QStandardItem(os.path.basename(path))
+            bin_item.setData(path, QtCore.Qt.ItemDataRole.UserRole)
+            bin_item.setDragEnabled(True)
+            bin_item.setDropEnabled(False)
+            items.append(bin_item)
+
+        parent = self.findItems(category, QtCore.Qt.MatchFlag.MatchExactly, 0)[0]
+        # QStandardItem.appendRows inserts all items with a single rowsInserted signal
+        parent.appendRows(items)
+        QtCore.qDebug(f"Added {len(items)} {category.lower()} files to project bin")
+        self.files_added.emit(category, paths)
+
+    def fromJson(self, json_string: dict, source_hashes=None):
+        # source_hashes maps source paths to their content hashes, so cached icons can be used
+        if source_hashes is None:
+            source_hashes = {}
         root = self.invisibleRootItem()
 
         self.beginResetModel()
         self.removeRows(0, self.rowCount())
 
-        for key, value in json_string.items():
-            category_item = QtGui.QStandardItem(key)
+        categories = {}
+        for n in ["STILLS", "VIDEO", "AUDIO"]:
+            category_item = QtGui.QStandardItem(n)
+            category_item.setDragEnabled(False)
+            category_item.setDropEnabled(True)
             root.appendRow(category_item)
+            categories[n] = category_item
 
+        for key, value in json_string.items():
             for v in value:
+                if key in categories:
+                    category_item = categories[key]
+                else:
+                    # Older project files stored the bin without category names
+                    mimetype = mimetypes.guess_type(v)[0] or ""
+                    category_item = categories["STILLS" if mimetype.startswith("image") else
+                                               "AUDIO" if mimetype.startswith("audio") else "VIDEO"]
                 file = os.path.basename(v)
                 bin_item = QtGui.QStandardItem(file)
-                pixmap = None
-
-                if key == "AUDIO":
-                    pixmap = QtGui.QPixmap(MV_ICON_SIZE, MV_ICON_SIZE)
-                    pixmap.fill(QtGui.QColor("black"))
-                elif key == "STILLS":
-                    pixmap = QtGui.QPixmap(v).scaled(MV_ICON_SIZE, MV_ICON_SIZE,
-                                                     QtCore.Qt.AspectRatioMode.KeepAspectRatio,
-                                                     QtCore.Qt.TransformationMode.FastTransformation)
-                elif key == "VIDEO":
-                    keyframe_image = getKeyframeFromVideo(v)
-                    pixmap = (QtGui.QPixmap().fromImage(keyframe_image).
-                              scaled(MV_ICON_SIZE, MV_ICON_SIZE,
-                                     QtCore.Qt.AspectRatioMode.KeepAspectRatio,
-                                     QtCore.Qt.TransformationMode.FastTransformation))
-
-                if pixmap:
-                    tooltip_image = jsonValFromPixmap(pixmap)
-                    html = f'<img src="data:image/png;base64,{tooltip_image}">'
-                    bin_item.setData(html, QtCore.Qt.ItemDataRole.ToolTipRole)
-
                 bin_item.setData(v, QtCore.Qt.ItemDataRole.UserRole)
+                if v in source_hashes:
+                    bin_item.setData(source_hashes[v], MV_SOURCE_HASH_ROLE)
                 category_item.appendRow(bin_item)
 
+        self._tooltips = {}
         self.endResetModel()
 
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        value = super().data(index, role)
+        if value is None and role == QtCore.Qt.ItemDataRole.ToolTipRole and index.parent().isValid():
+            # Tooltips with an icon of the file are only rendered when they are shown
+            value = self.tooltip(index)
+        return value
+
+    def tooltip(self, index) -> str | None:
+        path = index.data(QtCore.Qt.ItemDataRole.UserRole)
+        if path in self._tooltips:
+            return self._tooltips[path]
+
+        category = index.parent().data()
+        if category == "AUDIO":
+            pixmap = QtGui.QPixmap(MV_ICON_SIZE, MV_ICON_SIZE)
+            pixmap.fill(QtGui.QColor("black"))
+        elif category in ("STILLS", "VIDEO"):
+            scene_type = Scene_Type.STILL if category == "STILLS" else Scene_Type.VIDEO
+            preview, icon = loadRenditions(path, scene_type, index.data(MV_SOURCE_HASH_ROLE) or "")
+            pixmap = QtGui.QPixmap().fromImage(icon)
+        else:
+            return None
+
+        tooltip_image = jsonValFromPixmap(pixmap)
+        self._tooltips[path] = f'<img src="data:image/png;base64,{tooltip_image}">'
+        return self._tooltips[path]
+
+
+def selectedRows(view: QtWidgets.QAbstractItemView) -> list[int]:
+    return sorted({sourceIndex(index).row() for index in view.selectionModel().selectedIndexes()})
+
+
+def inversePermutation(rows) -> array.array:
+    inverse = array.array('I', bytes(array.array('I').itemsize * len(rows)))
+    for new_row, row in enumerate(rows):
+        inverse[row] = new_row
+    return inverse
+
+
+def rowRanges(rows: list[int]) -> list[tuple[int, int]]:
+    # Splits sorted rows into ranges of contiguous rows, as (first, last) tuples
+    ranges = []
+    for _, group in itertools.groupby(enumerate(rows), key=lambda x: x[1] - x[0]):
+        group = list(group)
+        ranges.append((group[0][1], group[-1][1]))
+    return ranges
+
 
 def forEach(model: QtCore.QAbstractItemModel, parent=QtCore.QModelIndex()):
     for r in range(0, model.rowCount(parent)):
@@ -922,6 +1572,434 @@ def forEach(model: QtCore.QAbstractItemModel, parent=QtCore.QModelIndex()):
             yield None, data
 
 
+def sourceIndex(index: QtCore.QModelIndex) -> QtCore.QModelIndex:
+    # Filtered views give indexes of their proxy model, scenes and bin items are addressed by source indexes
+    model = index.model()
+    return model.mapToSource(index) if isinstance(model, QtCore.QAbstractProxyModel) else index
+
+
+def sourceModelOf(view: QtWidgets.QAbstractItemView) -> QtCore.QAbstractItemModel:
+    model = view.model()
+    return model.sourceModel() if isinstance(model, QtCore.QAbstractProxyModel) else model
+
+
+def searchWords(text: str) -> list[str]:
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def searchDateRange(value: str) -> tuple[int | None, int | None] | None:
+    # Dates are given as YYYY, YYYY-MM or YYYY-MM-DD, ranges as FIRST..LAST with an optional first or last date.
+    # Returns the range in milliseconds since the epoch with an exclusive end, like the capture times of scenes.
+    first, separator, last = value.partition("..")
+    if not separator:
+        last = first
+    try:
+        start = searchDate(first, False) if first else None
+        end = searchDate(last, True) if last else None
+    except ValueError:
+        return None
+    return start, end
+
+
+def searchDate(value: str, end: bool) -> int:
+    match = re.fullmatch(r"(\d{4})(?:[-:](\d\d?)(?:[-:](\d\d?))?)?", value)
+    if match is None:
+        raise ValueError(f"Invalid date {value}")
+    year, month, day = (int(group) if group else None for group in match.groups())
+    date_time = datetime.datetime(year, month or 1, day or 1, tzinfo=datetime.timezone.utc)
+    if end:
+        # The end of a range is the start of the year, month or day after the given one
+        if day is not None:
+            date_time += datetime.timedelta(days=1)
+        elif month is not None:
+            date_time = date_time.replace(year=year + month // 12, month=month % 12 + 1)
+        else:
+            date_time = date_time.replace(year=year + 1)
+    return int(date_time.timestamp()) * 1000
+
+
+class SearchIndex:
+    """
+    Inverted index of the scenes or bin items of a project for the filter bar. Every word of an indexed field is
+    stored as a "field:word" term with the keys of the items that contain it, so a query looks up the keys of its
+    words instead of reading the data of every item. Terms are matched by prefix in a sorted vocabulary, capture
+    times by range in a sorted timeline. Both are rebuilt on the next query after items were added or changed.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self):
+        return len(self._terms)
+
+    def clear(self):
+        self._postings = {}
+        self._terms = {}
+        self._vocabulary = []
+        self._times = {}
+        self._timeline = ([], [])
+        self._kinds = {}
+        self._kind_of = {}
+
+    def put(self, key, fields: dict, capture_time: int | None = None, kind: str | None = None):
+        # Only the terms that changed are updated, so editing an item does not invalidate the vocabulary
+        terms = {f"{field}:{word}" for field, text in fields.items() if text for word in searchWords(text)}
+        old_terms = self._terms.get(key, frozenset())
+        self.discardTerms(key, old_terms - terms)
+        for term in terms - old_terms:
+            keys = self._postings.get(term)
+            if keys is None:
+                keys = self._postings[term] = set()
+                self._vocabulary = None
+            keys.add(key)
+        self._terms[key] = frozenset(terms)
+
+        if self._times.get(key) != capture_time:
+            if capture_time is None:
+                del self._times[key]
+            else:
+                self._times[key] = capture_time
+            self._timeline = None
+
+        if self._kind_of.get(key) != kind:
+            self.discardKind(key)
+            if kind is not None:
+                self._kinds.setdefault(kind, set()).add(key)
+                self._kind_of[key] = kind
+
+    def remove(self, key):
+        self.discardTerms(key, self._terms.pop(key, ()))
+        if self._times.pop(key, None) is not None:
+            self._timeline = None
+        self.discardKind(key)
+
+    def discardTerms(self, key, terms):
+        # Terms without keys stay in the vocabulary until it is rebuilt, they just do not match anything
+        for term in terms:
+            keys = self._postings[term]
+            keys.discard(key)
+            if not keys:
+                del self._postings[term]
+
+    def discardKind(self, key):
+        kind = self._kind_of.pop(key, None)
+        if kind is not None:
+            self._kinds[kind].discard(key)
+
+    def keysWithPrefix(self, word: str, fields=MV_SEARCH_FIELDS) -> set:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        matches = []
+        for field in fields:
+            prefix = f"{field}:{word}"
+            i = bisect.bisect_left(vocabulary, prefix)
+            while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+                matches.append(self._postings.get(vocabulary[i], ()))
+                i += 1
+        return set().union(*matches)
+
+    def keysInTimeRange(self, start: int | None, end: int | None) -> set:
+        if self._timeline is None:
+            entries = sorted(self._times.items(), key=lambda entry: entry[1])
+            self._timeline = ([time for _, time in entries], [key for key, _ in entries])
+        times, keys = self._timeline
+        first = bisect.bisect_left(times, start) if start is not None else 0
+        last = bisect.bisect_left(times, end) if end is not None else len(times)
+        return set(keys[first:last])
+
+    def keysOfKind(self, kind: str) -> set:
+        # Kinds are matched by prefix in both directions, so "vid" finds videos and "stills" finds stills
+        return set().union(*(keys for name, keys in self._kinds.items()
+                             if name.startswith(kind) or kind.startswith(name)))
+
+    def conditions(self, text: str) -> list[tuple]:
+        # Parses a query into (field, value) conditions, which all have to match. Words without a field have the
+        # field None, date ranges are parsed into their start and end, or None if they are invalid.
+        conditions = []
+        for term in text.split():
+            field, separator, value = term.partition(":")
+            field = field.lower()
+            if not separator or field not in MV_SEARCH_FIELDS + ("type", "date"):
+                field, value = None, term
+            value = value.lower()
+            if not value:
+                continue
+
+            if field == "date":
+                conditions.append((field, searchDateRange(value)))
+            elif field == "type":
+                conditions.append((field, value))
+            else:
+                conditions.extend((field, word) for word in searchWords(value))
+        return conditions
+
+    def query(self, text: str) -> set | None:
+        # Returns the keys matching all conditions of a query, or None for an empty query, which matches all items
+        results = []
+        for field, value in self.conditions(text):
+            if field == "date":
+                results.append(self.keysInTimeRange(*value) if value else set())
+            elif field == "type":
+                results.append(self.keysOfKind(value))
+            else:
+                results.append(self.keysWithPrefix(value, (field,) if field else MV_SEARCH_FIELDS))
+
+        if not results:
+            return None
+        results.sort(key=len)
+        matches = results[0]
+        for keys in results[1:]:
+            if not matches:
+                break
+            matches = matches & keys
+        return matches
+
+    def matches(self, key, conditions: list[tuple]) -> bool:
+        # Checks a single item against the conditions of a query, e.g. when it was added or changed
+        terms = self._terms.get(key)
+        if terms is None:
+            return False
+        for field, value in conditions:
+            if field == "date":
+                capture_time = self._times.get(key)
+                if (value is None or capture_time is None or (value[0] is not None and capture_time < value[0]) or
+                        (value[1] is not None and capture_time >= value[1])):
+                    return False
+            elif field == "type":
+                kind = self._kind_of.get(key)
+                if kind is None or not (kind.startswith(value) or value.startswith(kind)):
+                    return False
+            else:
+                prefixes = tuple(f"{name}:{value}" for name in ((field,) if field else MV_SEARCH_FIELDS))
+                if not any(term.startswith(prefixes) for term in terms):
+                    return False
+        return True
+
+
+class SearchFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """
+    Filters a model by a query on a SearchIndex of its items. row_entry is called with a row and parent of the
+    source model and returns the key of the item in the row with its fields, capture time and kind for the index,
+    or None for rows without an item. row_key returns only the key, if it is cheaper to get than the whole entry.
+    The keys of the rows are kept in lists that follow the rows of the source model, so filtering a row is a set
+    lookup of its key instead of a call to data(), and added or changed items are matched one by one.
+    Source models may have one level of child rows, like the project bin.
+    """
+
+    def __init__(self, source_model: QtCore.QAbstractItemModel, row_entry, row_key=None, parent=None):
+        super().__init__(parent)
+        self.search_index = SearchIndex()
+        self._row_entry = row_entry
+        self._row_key = row_key
+        # Keys of the rows of the source model by the row of their parent, -1 for the top level rows
+        self._row_keys = {}
+        # Items are removed from the index with the last row that has their key
+        self._key_counts = collections.Counter()
+        self._removed_keys = []
+        self._query = ""
+        self._conditions = []
+        self._matches = None
+
+        # Connected before the source model is set, so the keys and the index are up to date when the proxy filters
+        # the changed rows
+        source_model.rowsInserted.connect(self.insertRowKeys)
+        source_model.rowsAboutToBeRemoved.connect(self.collectRowKeys)
+        source_model.rowsRemoved.connect(self.removeRowKeys)
+        source_model.rowsMoved.connect(self.rebuildRowKeys)
+        source_model.layoutChanged.connect(self.rebuildRowKeys)
+        source_model.dataChanged.connect(self.updateRowKeys)
+        source_model.modelReset.connect(self.rebuildIndex)
+        self.setSourceModel(source_model)
+        self.rebuildIndex()
+
+    def query(self) -> str:
+        return self._query
+
+    def setQuery(self, text: str):
+        text = text.strip()
+        if text == self._query:
+            return
+        self._query = text
+        start = time.perf_counter()
+        self._conditions = self.search_index.conditions(text)
+        self._matches = self.search_index.query(text)
+        if self._matches is not None:
+            QtCore.qDebug(f"Query '{text}' matched {len(self._matches)} of {len(self.search_index)} items "
+                          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        self.invalidateFilter()
+
+    def isFiltered(self) -> bool:
+        return self._matches is not None
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QtCore.QModelIndex) -> bool:
+        if self._matches is None:
+            return True
+        keys = self._row_keys.get(source_parent.row() if source_parent.isValid() else -1)
+        return keys is not None and keys[source_row] in self._matches
+
+    def rowKey(self, row: int, parent: QtCore.QModelIndex):
+        if self._row_key is not None:
+            return self._row_key(row, parent)
+        entry = self._row_entry(row, parent)
+        return entry[0] if entry is not None else None
+
+    def matchKeys(self, keys):
+        if self._matches is None:
+            return
+        for key in keys:
+            if key is None:
+                continue
+            if self.search_index.matches(key, self._conditions):
+                self._matches.add(key)
+            else:
+                self._matches.discard(key)
+
+    def releaseKey(self, key):
+        if key is None:
+            return
+        self._key_counts[key] -= 1
+        if self._key_counts[key] <= 0:
+            del self._key_counts[key]
+            self.search_index.remove(key)
+            if self._matches is not None:
+                self._matches.discard(key)
+
+    def insertRowKeys(self, parent: QtCore.QModelIndex, first: int, last: int):
+        parent_row = parent.row() if parent.isValid() else -1
+        if parent_row < 0 and len(self._row_keys) > 1:
+            # The child rows of the top level rows after the inserted ones move down
+            count = last - first + 1
+            self._row_keys = {(row + count if row >= first else row): keys for row, keys in self._row_keys.items()}
+
+        entries = [self._row_entry(row, parent) for row in range(first, last + 1)]
+        keys = [entry[0] if entry is not None else None for entry in entries]
+        self._row_keys.setdefault(parent_row, [])[first:first] = keys
+        for entry in entries:
+            if entry is not None:
+                self._key_counts[entry[0]] += 1
+                self.search_index.put(*entry)
+        self.matchKeys(keys)
+
+    def collectRowKeys(self, parent: QtCore.QModelIndex, first: int, last: int):
+        parent_row = parent.row() if parent.isValid() else -1
+        self._removed_keys.extend(self._row_keys.get(parent_row, [])[first:last + 1])
+        if parent_row < 0:
+            # Removing a top level row removes its child rows as well
+            for row in range(first, last + 1):
+                self._removed_keys.extend(self._row_keys.get(row, []))
+
+    def removeRowKeys(self, parent: QtCore.QModelIndex, first: int, last: int):
+        parent_row = parent.row() if parent.isValid() else -1
+        if parent_row in self._row_keys:
+            del self._row_keys[parent_row][first:last + 1]
+        if parent_row < 0 and len(self._row_keys) > 1:
+            count = last - first + 1
+            self._row_keys = {(row - count if row > last else row): keys for row, keys in self._row_keys.items()
+                              if not first <= row <= last}
+        # Keys are only released after the rows are removed, because moved rows may be inserted before the rows they
+        # are moved from are removed
+        for key in self._removed_keys:
+            self.releaseKey(key)
+        self._removed_keys = []
+
+    def rebuildRowKeys(self, *args):
+        # Rows were moved or sorted, which changes the order of the keys but not the items
+        source_model = self.sourceModel()
+        root = QtCore.QModelIndex()
+        self._row_keys = {-1: [self.rowKey(row, root) for row in range(source_model.rowCount(root))]}
+        for index in self.parentIndexes():
+            self._row_keys[index.row()] = [self.rowKey(child, index) for child in range(source_model.rowCount(index))]
+
+    def parentIndexes(self) -> list[QtCore.QModelIndex]:
+        # Top level rows with child rows, table models like the sequence have none
+        source_model = self.sourceModel()
+        if isinstance(source_model, QtCore.QAbstractTableModel):
+            return []
+        root = QtCore.QModelIndex()
+        indexes = (source_model.index(row, 0, root) for row in range(source_model.rowCount(root)))
+        return [index for index in indexes if source_model.hasChildren(index)]
+
+    def updateRowKeys(self, top_left: QtCore.QModelIndex, bottom_right: QtCore.QModelIndex, roles=()):
+        # e.g. new icons of scenes do not change any indexed field
+        if roles and QtCore.Qt.ItemDataRole.DisplayRole not in roles and QtCore.Qt.ItemDataRole.EditRole not in roles:
+            return
+        parent = top_left.parent()
+        keys = self._row_keys.get(parent.row() if parent.isValid() else -1)
+        if keys is None:
+            return
+        changed = []
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            entry = self._row_entry(row, parent)
+            key = entry[0] if entry is not None else None
+            if key != keys[row]:
+                self.releaseKey(keys[row])
+                keys[row] = key
+                if key is not None:
+                    self._key_counts[key] += 1
+            if entry is not None:
+                self.search_index.put(*entry)
+                changed.append(key)
+        self.matchKeys(changed)
+
+    def rebuildIndex(self):
+        self.search_index.clear()
+        # The rows are matched as a whole when the index is complete, not one by one while it is built
+        self._matches = None
+        self._row_keys = {}
+        self._key_counts = collections.Counter()
+        self._removed_keys = []
+        source_model = self.sourceModel()
+        root = QtCore.QModelIndex()
+        self.insertRowKeys(root, 0, source_model.rowCount(root) - 1)
+        for index in self.parentIndexes():
+            self.insertRowKeys(index, 0, source_model.rowCount(index) - 1)
+        self._conditions = self.search_index.conditions(self._query)
+        self._matches = self.search_index.query(self._query)
+
+
+def sceneSearchKey(scene) -> QtCore.QUuid | None:
+    return scene.uuid if scene else None
+
+
+def sceneSearchEntry(scene) -> tuple | None:
+    # Scenes are indexed by their UUID, with the file names of their sources, camera model, notes and capture time
+    if not scene:
+        return None
+    exif = scene.exif or {}
+    fields = {"name": os.path.basename(scene.source), "camera": str(exif.get("EXIF:Model", "")),
+              "notes": scene.notes, "audio": os.path.basename(scene.audio_source or "")}
+    kind = Scene_Type(scene.scene_type).name.lower() if scene.scene_type is not None else None
+    return scene.uuid, fields, scene.capture_time, kind
+
+
+def binSearchEntry(bin_model: QtGui.QStandardItemModel, row: int, parent: QtCore.QModelIndex) -> tuple | None:
+    # Bin items are indexed by their path, with their file name and the category they are in
+    if not parent.isValid():
+        return None
+    bin_item = bin_model.itemFromIndex(bin_model.index(row, 0, parent))
+    path = bin_item.data(QtCore.Qt.ItemDataRole.UserRole)
+    kind = {"STILLS": "still", "VIDEO": "video", "AUDIO": "audio"}.get(bin_item.parent().text())
+    return path, {"name": os.path.basename(path)}, None, kind
+
+
+class SceneFilterProxyModel(SearchFilterProxyModel):
+    def __init__(self, sequence: Mv_sequence, parent=None):
+        super().__init__(sequence, lambda row, _: sceneSearchEntry(sequence.item(row)),
+                         lambda row, _: sceneSearchKey(sequence.item(row)), parent)
+
+    def sort(self, column, order=QtCore.Qt.SortOrder.AscendingOrder):
+        # Sorting the table sorts the show, the proxy keeps the order of the sequence
+        self.sourceModel().sort(column, order)
+
+
+class BinFilterProxyModel(SearchFilterProxyModel):
+    def __init__(self, bin_model: QtGui.QStandardItemModel, parent=None):
+        super().__init__(bin_model, functools.partial(binSearchEntry, bin_model), parent=parent)
+        # Categories are shown as long as one of their files matches
+        self.setRecursiveFilteringEnabled(True)
+
+
 class BinItem(QtGui.QStandardItem):
     def __init__(self, *__args):
         super().__init__()
@@ -961,13 +2039,142 @@ class ProjectSettings(QtCore.QObject):
             return True
 
 
+class IngestIndex:
+    """
+    Index of the media files that have been ingested into a project, keyed by path with their file identity
+    (size, modification time and inode), so a re-scan of a directory only processes new or changed files.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def toJson(self) -> dict:
+        with self._lock:
+            return {"ingest_index": {path: list(identity) for path, identity in self._entries.items()}}
+
+    def fromJson(self, json_dict: dict):
+        with self._lock:
+            self._entries = {path: tuple(identity) for path, identity in json_dict.items()}
+
+    def contains(self, path: str) -> bool:
+        with self._lock:
+            return path in self._entries
+
+    def get(self, path: str) -> tuple[int, int, int] | None:
+        with self._lock:
+            return self._entries.get(path)
+
+    def put(self, path: str, identity: tuple[int, int, int]):
+        with self._lock:
+            self._entries[path] = identity
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+
+class ProjectJournal:
+    """
+    Append-only journal of the edits to a project since it was last saved, kept next to the project file.
+    Each edit is written as one JSON line, so the cost of an autosave depends on the size of the edit only.
+    The journal starts with a header that identifies the state of the project file it applies to, and is
+    replayed when that project file is opened again after a crash.
+    """
+
+    def __init__(self, project_file: str):
+        self.project_file = project_file
+        self.path = project_file + MV_JOURNAL_SUFFIX
+        # Lines written since the header, so the journal can be compacted after a save
+        self._lines = []
+        self._pending = []
+        self._file = None
+        self.age = QtCore.QElapsedTimer()
+
+    def _base(self) -> list:
+        size, mtime, inode = fileIdentity(self.project_file)
+        return [size, mtime]
+
+    def read(self) -> list[dict]:
+        # Returns the records left behind for the current state of the project file
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if header.get("base") != self._base():
+                    QtCore.qWarning(f"Ignoring journal {self.path}, it does not belong to the project file")
+                    return []
+                records = []
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # The last line may be incomplete after a crash
+                        break
+                return records
+        except (OSError, ValueError):
+            return []
+
+    def open(self, lines=()):
+        # Starts the journal for the current state of the project file, with the given lines carried over
+        self.close()
+        self._lines = list(lines)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"journal": 1, "base": self._base()}) + "\n")
+            for line in self._lines:
+                f.write(line + "\n")
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self.age.start()
+
+    def append(self, record: dict):
+        self._pending.append(json.dumps(record))
+
+    def records(self) -> int:
+        return len(self._lines) + len(self._pending)
+
+    def flush(self):
+        if not self._pending or self._file is None:
+            return
+        self._file.write("".join(line + "\n" for line in self._pending))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._lines.extend(self._pending)
+        self._pending = []
+
+    def compact(self, mark: int, project_file: str):
+        # Called after the project has been saved from a snapshot taken at mark records. Edits made while it
+        # was saved are carried over to the journal of the saved file.
+        self.flush()
+        lines = self._lines[mark:]
+        if project_file != self.project_file:
+            self.close(remove=True)
+            self.project_file = project_file
+            self.path = project_file + MV_JOURNAL_SUFFIX
+        self.open(lines)
+
+    def close(self, remove=False):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if remove:
+            self._lines = []
+            self._pending = []
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
 def getPixmapFromScene(scene: Mv_Scene) -> QtGui.QPixmap:
     if scene:
         if type(scene.pixmap) is QtGui.QPixmap:
             pixmap = scene.pixmap
+        elif scene.renditions is not None:
+            pixmap = QtGui.QPixmap().fromImage(scene.renditions.preview())
         else:
             if scene.scene_type == Scene_Type.STILL:
-                pixmap = QtGui.QPixmap(scene.source)
+                pixmap = QtGui.QPixmap().fromImage(loadScaledImage(scene.source, MV_PREVIEW_SIZE))
             elif scene.scene_type == Scene_Type.VIDEO:
                 image = getKeyframeFromVideo(scene.source)
                 pixmap = QtGui.QPixmap().fromImage(image)
@@ -993,22 +2200,262 @@ def scalePixmapToWidget(widget: QtWidgets.QWidget,
 
 
 def getKeyframeFromVideo(path) -> QtGui.QImage:
+    probe = getVideoProbe(path)
+    if probe is None or probe.image is None:
+        QtCore.qWarning(f"No keyframe found in video file {path}")
+        return QtGui.QImage()
+
+    return probe.keyframe()
+
+
+class VideoProbe:
+    # Plain data only, so probes can be returned from ingest worker processes
+    def __init__(self, path: str, duration=0, in_point=0, out_point=0, has_audio=False,
+                 width=0, height=0, codec="", image=None):
+        self.path = path
+        self.duration = duration
+        self.in_point = in_point
+        self.out_point = out_point
+        self.has_audio = has_audio
+        self.width = width
+        self.height = height
+        self.codec = codec
+        self.image = image
+
+    def keyframe(self) -> QtGui.QImage:
+        return imageFromDecodeResult(self.image) if self.image is not None else QtGui.QImage()
+
+
+def probeVideo(path: str, keyframe=True, size=MV_PREVIEW_SIZE) -> VideoProbe | None:
+    # Reads all information about a video that is needed for a scene with a single container open
     with av.open(path) as container:
+        if len(container.streams.video) == 0:
+            return None
+
         stream = container.streams.video[0]
-        stream.codec_context.skip_frame = "NONKEY"
-        container.streams.video[0].thread_type = "AUTO"
+        if stream.duration is not None:
+            duration = int(stream.duration * stream.time_base * 1000)
+        else:
+            # Some containers only know the duration of the whole file
+            duration = (container.duration or 0) // 1000
+        if stream.start_time is not None:
+            in_point = int(stream.start_time * stream.time_base * 1000)
+        else:
+            in_point = 0
+
+        probe = VideoProbe(path,
+                           duration=duration,
+                           in_point=in_point,
+                           out_point=duration - in_point,
+                           has_audio=(len(container.streams.audio) > 0),
+                           width=stream.codec_context.width,
+                           height=stream.codec_context.height,
+                           codec=stream.codec_context.name)
+
+        if keyframe:
+            stream.codec_context.skip_frame = "NONKEY"
+            stream.thread_type = "AUTO"
+
+            # Get the first keyframe of the video and scale it down to the preview size
+            pil_image = next(container.decode(stream)).to_image()
+            pil_image.thumbnail((size, size), PIL.Image.Resampling.LANCZOS)
+            probe.image = (pil_image.mode, pil_image.width, pil_image.height, pil_image.tobytes())
+
+    return probe
+
+
+class VideoProbeMemo:
+    """
+    Keeps the most recent video probes, keyed by path and file identity.
+    """
+
+    def __init__(self, max_entries=MV_VIDEO_PROBE_MEMO_SIZE):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, identity: tuple[int, int, int], keyframe=True) -> VideoProbe | None:
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is None or entry[0] != identity:
+                return None
+            self._entries[path] = entry
+            probe = entry[1]
+
+        if keyframe and probe.image is None:
+            return None
+        return probe
+
+    def put(self, path: str, identity: tuple[int, int, int], probe: VideoProbe):
+        with self._lock:
+            self._entries.pop(path, None)
+            self._entries[path] = (identity, probe)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+
+video_probes = VideoProbeMemo()
 
-        # Get the first keyframe for the video and convert it to a QImage
-        keyframe = next(container.decode(stream))
-        # noinspection PyTypeChecker
-        image: QtGui.QImage = PIL.ImageQt.ImageQt(keyframe.to_image())
 
-        # Use convertTo to detach image from original buffer before returning
-        image.convertTo(QtGui.QImage.Format.Format_RGB888)
+def getVideoProbe(path: str, keyframe=True) -> VideoProbe | None:
+    try:
+        identity = fileIdentity(path)
+    except OSError:
+        identity = None
+    else:
+        probe = video_probes.get(path, identity, keyframe)
+        if probe is not None:
+            return probe
+
+    probe = probeVideo(path, keyframe)
+    if probe is not None and identity is not None:
+        video_probes.put(path, identity, probe)
+    return probe
+
+
+def hashFile(path: str, mode=Hash_Mode.SHA1) -> str:
+    # SHA-1 hashes are stored without a prefix to stay compatible with existing projects
+    if mode == Hash_Mode.QUICK:
+        return quickFileId(path)
+    elif mode == Hash_Mode.BLAKE2:
+        file_hash = hashlib.blake2b(digest_size=32)
+        prefix = "blake2b:"
+    else:
+        file_hash = hashlib.sha1()
+        prefix = ""
+
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(BUF_SIZE)
+            if not data:
+                break
+            file_hash.update(data)
+
+    return prefix + file_hash.hexdigest()
+
+
+def quickFileId(path: str) -> str:
+    # Identifies a file by its size and the data at its head and tail instead of reading it completely
+    quick_id = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        quick_id.update(size.to_bytes(8, "little"))
+        quick_id.update(f.read(MV_QUICK_ID_SIZE))
+        if size > 2 * MV_QUICK_ID_SIZE:
+            f.seek(-MV_QUICK_ID_SIZE, os.SEEK_END)
+            quick_id.update(f.read(MV_QUICK_ID_SIZE))
+
+    return "quick:" + quick_id.hexdigest()
+
+
+def hashModeFromValue(value: str) -> Hash_Mode:
+    if value.startswith("quick:"):
+        return Hash_Mode.QUICK
+    elif value.startswith("blake2b:"):
+        return Hash_Mode.BLAKE2
+    else:
+        return Hash_Mode.SHA1
+
 
+def fileIdentity(path: str) -> tuple[int, int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def verifyMediaFile(path: str, file_hash: str, identity=None, full=False) -> bool:
+    # The quick check compares size and modification time with the identity recorded when the file was ingested
+    # and the stored hash with a memoized one. The full check hashes the file again. Raises OSError if the file
+    # can not be read.
+    current = fileIdentity(path)
+    if not full:
+        if identity is not None and tuple(identity[:2]) != current[:2]:
+            return False
+        memoized = hash_memo.get(path, hashModeFromValue(file_hash), current) if file_hash else None
+        return memoized is None or memoized == file_hash
+
+    if not file_hash:
+        return True
+    value = hashFile(path, hashModeFromValue(file_hash))
+    hash_memo.put(path, value, current)
+    return value == file_hash
+
+
+def decodeStill(path: str, size=MV_PREVIEW_SIZE):
+    # Runs in an ingest worker process, so the result is plain data instead of a QImage
+    try:
+        with PIL.Image.open(path) as pil_image:
+            # JPEG images are scaled down by the decoder (DCT scaling), so the full resolution is never decoded
+            pil_image.draft("RGB", (size, size))
+            pil_image = PIL.ImageOps.exif_transpose(pil_image)
+            pil_image = pil_image.convert("RGBA" if pil_image.has_transparency_data else "RGB")
+    except (OSError, ValueError, PIL.Image.DecompressionBombError):
+        # Let Qt try its own image plugins for formats that Pillow does not understand
+        return None
+
+    pil_image.thumbnail((size, size), PIL.Image.Resampling.LANCZOS)
+
+    return pil_image.mode, pil_image.width, pil_image.height, pil_image.tobytes()
+
+
+def decodeEmbeddedPreview(data: bytes, orientation=1, size=MV_PREVIEW_SIZE):
+    # Embedded previews do not carry the orientation of the main image, so it is applied here
+    transpose_methods = {2: PIL.Image.Transpose.FLIP_LEFT_RIGHT,
+                         3: PIL.Image.Transpose.ROTATE_180,
+                         4: PIL.Image.Transpose.FLIP_TOP_BOTTOM,
+                         5: PIL.Image.Transpose.TRANSPOSE,
+                         6: PIL.Image.Transpose.ROTATE_270,
+                         7: PIL.Image.Transpose.TRANSVERSE,
+                         8: PIL.Image.Transpose.ROTATE_90}
+    try:
+        with PIL.Image.open(io.BytesIO(data)) as pil_image:
+            pil_image.draft("RGB", (size, size))
+            pil_image = pil_image.convert("RGB")
+    except (OSError, ValueError):
+        return None
+
+    if orientation in transpose_methods:
+        pil_image = pil_image.transpose(transpose_methods[orientation])
+    pil_image.thumbnail((size, size), PIL.Image.Resampling.LANCZOS)
+
+    return pil_image.mode, pil_image.width, pil_image.height, pil_image.tobytes()
+
+
+def loadScaledImage(path: str, size: int) -> QtGui.QImage:
+    # Decodes a still image at roughly the requested size instead of its full resolution
+    try:
+        with PIL.Image.open(path) as pil_image:
+            is_jpeg = pil_image.format == "JPEG"
+    except (OSError, ValueError):
+        is_jpeg = False
+
+    if is_jpeg:
+        result = decodeStill(path, size)
+        if result is not None:
+            return imageFromDecodeResult(result)
+
+    reader = QtGui.QImageReader(path)
+    reader.setAutoTransform(True)
+    original_size = reader.size()
+    if original_size.isValid() and (original_size.width() > size or original_size.height() > size):
+        reader.setScaledSize(original_size.scaled(size, size, QtCore.Qt.AspectRatioMode.KeepAspectRatio))
+
+    image = reader.read()
+    if image.isNull():
+        QtCore.qWarning(f"Failed to load image {path}: {reader.errorString()}")
     return image
 
 
+def imageFromDecodeResult(result) -> QtGui.QImage:
+    mode, width, height, data = result
+    if mode == "RGBA":
+        image_format = QtGui.QImage.Format.Format_RGBA8888
+    else:
+        image_format = QtGui.QImage.Format.Format_RGB888
+
+    # Use copy to detach the image from the bytes object it was created from
+    return QtGui.QImage(data, width, height, width * len(mode), image_format).copy()
+
+
 def get_supported_mime_types() -> list:
     result = []
     for f in QtMultimedia.QMediaFormat().supportedFileFormats(QtMultimedia.QMediaFormat.ConversionMode.Decode):
@@ -1037,6 +2484,90 @@ def pixmapFromJsonVal(val: str) -> QtGui.QPixmap:
     return pixmap
 
 
+def scenesToMimeData(scenes: list) -> QtCore.QMimeData:
+    # Scenes are copied with their state, including the preview pixmap, so they can be pasted into any project
+    # without hashing, probing or decoding their sources again
+    payload = QtCore.QByteArray()
+    stream = QtCore.QDataStream(payload, QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    stream.writeUInt32(MV_SCENES_FORMAT_VERSION)
+    stream.writeUInt32(len(scenes))
+    for scene in scenes:
+        (scene_uuid, source, audio_source, scene_type, pause, duration, notes, exif, pixmap, source_hash,
+         audio_source_hash, in_point, out_point, play_video_audio) = scene.__getstate__()
+        # Each field is written with its type, nothing on the clipboard is unpickled when it is pasted
+        stream.writeQString(scene_uuid)
+        stream.writeQString(source)
+        stream.writeQString(audio_source)
+        stream.writeInt32(scene_type)
+        stream.writeBool(pause)
+        stream.writeInt64(duration)
+        stream.writeQString(notes)
+        stream.writeQString(json.dumps(exif))
+        stream.writeBytes(pixmap)
+        stream.writeQString(source_hash)
+        stream.writeQString(audio_source_hash)
+        stream.writeInt64(in_point)
+        stream.writeInt64(out_point)
+        stream.writeBool(bool(play_video_audio))
+
+    mime_data = QtCore.QMimeData()
+    mime_data.setData(MV_SCENES_MIME_TYPE, payload)
+    mime_data.setText("\n".join(scene.source for scene in scenes))
+    return mime_data
+
+
+def scenesFromMimeData(mime_data: QtCore.QMimeData) -> list[QtGui.QStandardItem]:
+    if mime_data is None or not mime_data.hasFormat(MV_SCENES_MIME_TYPE):
+        return []
+
+    # The stream does not keep a reference to the payload
+    payload = mime_data.data(MV_SCENES_MIME_TYPE)
+    stream = QtCore.QDataStream(payload, QtCore.QIODevice.OpenModeFlag.ReadOnly)
+    version = stream.readUInt32()
+    if stream.status() != QtCore.QDataStream.Status.Ok or version != MV_SCENES_FORMAT_VERSION:
+        QtCore.qWarning(f"Scenes on the clipboard have an unsupported format version {version}")
+        return []
+
+    items = []
+    for i in range(stream.readUInt32()):
+        state = [stream.readQString(), stream.readQString(), stream.readQString(), stream.readInt32(),
+                 stream.readBool(), stream.readInt64(), stream.readQString(), stream.readQString(),
+                 stream.readBytes(), stream.readQString(), stream.readQString(), stream.readInt64(),
+                 stream.readInt64(), stream.readBool()]
+        if stream.status() != QtCore.QDataStream.Status.Ok:
+            QtCore.qWarning(f"Failed to read scene {i} from the clipboard")
+            return []
+        try:
+            state[3] = Scene_Type(state[3])
+            state[7] = json.loads(state[7])
+            if state[7] is not None and not isinstance(state[7], dict):
+                raise ValueError("EXIF data is not an object")
+        except ValueError as e:
+            QtCore.qWarning(f"Invalid scene {i} on the clipboard: {e}")
+            return []
+        items.append(Mv_Scene.fromState(state))
+
+    return items
+
+
+def jsonValFromImage(image: QtGui.QImage) -> str:
+    buf = QtCore.QBuffer()
+    buf.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buf, "PNG")
+
+    return buf.data().toBase64().data().decode('latin-1')
+
+
+def encodeImage(image: QtGui.QImage) -> tuple[bytes, str]:
+    # Only use PNG if the alpha channel needs to be preserved, JPEG is much smaller for photos
+    extension = "png" if image.hasAlphaChannel() else "jpg"
+    buf = QtCore.QBuffer()
+    buf.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buf, extension.upper(), 90)
+
+    return buf.data().data(), extension
+
+
 def timeStringFromMsec(msec: int):
     minutes = msec // 60000
     seconds = (msec // 1000) % 60
@@ -1045,7 +2576,1142 @@ def timeStringFromMsec(msec: int):
     return f"{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
 
 
+class ThumbnailCache:
+    """
+    Persistent, content-addressed cache for the icon and preview renditions of media files.
+    Renditions are keyed by the source hash, so the cache is shared by all projects. When the cache grows
+    beyond its maximum size, the least recently used renditions are evicted.
+    """
+
+    def __init__(self, directory="", max_size=MV_THUMBNAIL_CACHE_SIZE):
+        self._directory = directory
+        self.max_size = max_size
+        self._total_size = None
+        self._lock = threading.Lock()
+
+    def directory(self) -> str:
+        if not self._directory:
+            # Resolve the location lazily, so the application name is already set when it is determined
+            cache_location = QtCore.QStandardPaths.writableLocation(
+                QtCore.QStandardPaths.StandardLocation.CacheLocation)
+            self._directory = os.path.join(cache_location, "thumbnails")
+        return self._directory
+
+    def _path(self, source_hash: str, size: int, extension: str) -> str:
+        # Hashes may carry a prefix like "blake2b:", which is not allowed in file names on all platforms
+        digest = source_hash.rpartition(":")[2]
+        file_name = f"{source_hash.replace(':', '-')}-{size}.{extension}"
+        return os.path.join(self.directory(), digest[:2], file_name)
+
+    def get(self, source_hash: str, size: int) -> QtGui.QImage | None:
+        if not source_hash:
+            return None
+
+        for extension in ("jpg", "png"):
+            path = self._path(source_hash, size, extension)
+            image = QtGui.QImage(path)
+            if not image.isNull():
+                try:
+                    # Bump the modification time, which is used as the access time for LRU eviction
+                    os.utime(path)
+                except OSError:
+                    pass
+                return image
+
+        return None
+
+    def put(self, source_hash: str, size: int, image: QtGui.QImage) -> bool:
+        if not source_hash or image is None or image.isNull():
+            return False
+
+        return self.putEncoded(source_hash, size, *encodeImage(image))
+
+    def putEncoded(self, source_hash: str, size: int, data: bytes, extension: str) -> bool:
+        if not source_hash or not data:
+            return False
+
+        path = self._path(source_hash, size, extension)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        except OSError as e:
+            QtCore.qWarning(f"Failed to create thumbnail cache directory: {e}")
+            return False
+
+        # Write to a temporary file first, so concurrent readers never see a partially written rendition
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            QtCore.qWarning(f"Failed to write thumbnail {path}: {e}")
+            return False
+
+        with self._lock:
+            if self._total_size is None:
+                self._total_size = self._scan()[1]
+            else:
+                self._total_size += os.path.getsize(path)
+            if self._total_size > self.max_size:
+                self._evict()
+
+        return True
+
+    def getEncoded(self, source_hash: str, size: int) -> tuple[bytes, str] | None:
+        # Returns the encoded rendition and its file extension, so it can be copied without re-encoding
+        if not source_hash:
+            return None
+
+        for extension in ("jpg", "png"):
+            try:
+                with open(self._path(source_hash, size, extension), 'rb') as f:
+                    return f.read(), extension
+            except OSError:
+                continue
+
+        return None
+
+    def alias(self, source_hash: str, new_hash: str):
+        # Makes the renditions cached for one hash of a file available under another hash of the same file
+        for size in (MV_ICON_SIZE, MV_PREVIEW_SIZE):
+            image = self.get(source_hash, size)
+            if image is not None:
+                self.put(new_hash, size, image)
+
+    def _scan(self) -> tuple[list, int]:
+        entries = []
+        total_size = 0
+        for root, dirs, files in os.walk(self.directory()):
+            for file in files:
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total_size += stat.st_size
+        return entries, total_size
+
+    def _evict(self):
+        entries, self._total_size = self._scan()
+        # Evict down to 90% of the maximum size, so eviction does not run again on every following write
+        target_size = self.max_size * 9 // 10
+        for mtime, size, path in sorted(entries):
+            if self._total_size <= target_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._total_size -= size
+        QtCore.qInfo(f"Evicted thumbnails from cache, cache size is now {self._total_size} bytes")
+
+
+thumbnail_cache = ThumbnailCache()
+icon_loader = concurrent.futures.ThreadPoolExecutor(max_workers=MV_ICON_PREFETCH_WORKERS)
+
+
+class HashMemo:
+    """
+    Persistent memo of file hashes, keyed by path and file identity (size, modification time and inode),
+    so files that have not changed are never hashed again.
+    """
+
+    def __init__(self, path="", max_entries=MV_HASH_MEMO_SIZE):
+        self._path = path
+        self.max_entries = max_entries
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def path(self) -> str:
+        if not self._path:
+            cache_location = QtCore.QStandardPaths.writableLocation(
+                QtCore.QStandardPaths.StandardLocation.CacheLocation)
+            self._path = os.path.join(cache_location, "hashes.json")
+        return self._path
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path(), 'r') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+
+    def get(self, path: str, mode=MV_HASH_MODE, identity=None) -> str | None:
+        if identity is None:
+            try:
+                identity = fileIdentity(path)
+            except OSError:
+                return None
+
+        with self._lock:
+            self._load()
+            entry = self._entries.get(path)
+            if entry is None or tuple(entry[:3]) != identity:
+                return None
+            return entry[3].get(Hash_Mode(mode).name)
+
+    def put(self, path: str, value: str, identity: tuple[int, int, int]):
+        mode = hashModeFromValue(value)
+        with self._lock:
+            self._load()
+            entry = self._entries.pop(path, None)
+            if entry is None or tuple(entry[:3]) != identity:
+                entry = [*identity, {}]
+            entry[3][mode.name] = value
+            # Re-insert the entry, so the dict order is the order of last use
+            self._entries[path] = entry
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._dirty = True
+
+    def fileHash(self, path: str, mode=MV_HASH_MODE) -> str:
+        # Capture the identity before hashing, so a file modified while it is hashed is hashed again next time
+        identity = fileIdentity(path)
+        value = self.get(path, mode, identity)
+        if value is None:
+            value = hashFile(path, mode)
+            self.put(path, value, identity)
+        return value
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = json.dumps(self._entries)
+            self._dirty = False
+
+        try:
+            os.makedirs(os.path.dirname(self.path()), exist_ok=True)
+            temp_path = f"{self.path()}.tmp"
+            with open(temp_path, 'w') as f:
+                f.write(entries)
+            os.replace(temp_path, self.path())
+        except OSError as e:
+            QtCore.qWarning(f"Failed to save hash memo: {e}")
+
+
+hash_memo = HashMemo()
+
+
+def loadRenditions(source: str, scene_type: Scene_Type, source_hash="") -> tuple[QtGui.QImage, QtGui.QImage]:
+    # Returns preview and icon renditions for a media file, using the thumbnail cache whenever possible
+    preview = thumbnail_cache.get(source_hash, MV_PREVIEW_SIZE)
+    icon = thumbnail_cache.get(source_hash, MV_ICON_SIZE)
+    if preview is not None and icon is not None:
+        return preview, icon
+
+    if scene_type == Scene_Type.VIDEO:
+        image = getKeyframeFromVideo(source)
+    elif scene_type == Scene_Type.STILL:
+        image = loadScaledImage(source, MV_PREVIEW_SIZE)
+    else:
+        image = QtGui.QImage(MV_ICON_SIZE, MV_ICON_SIZE, QtGui.QImage.Format.Format_RGB888)
+        image.fill(QtGui.QColor("black"))
+        return image, image
+
+    preview = image.scaled(MV_PREVIEW_SIZE, MV_PREVIEW_SIZE,
+                           QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                           QtCore.Qt.TransformationMode.SmoothTransformation)
+    icon = preview.scaled(MV_ICON_SIZE, MV_ICON_SIZE,
+                          QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                          QtCore.Qt.TransformationMode.SmoothTransformation)
+    thumbnail_cache.put(source_hash, MV_PREVIEW_SIZE, preview)
+    thumbnail_cache.put(source_hash, MV_ICON_SIZE, icon)
+
+    return preview, icon
+
+
+class ProjectArchive:
+    """
+    Read access to the entries of a project archive, shared by the scenes loaded from it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip_file = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+
+    def read(self, name: str) -> bytes:
+        with self._lock:
+            return self._zip_file.read(name)
+
+    def open(self, name: str):
+        with self._lock:
+            return self._zip_file.open(name)
+
+    def size(self, name: str) -> int:
+        return self._zip_file.getinfo(name).file_size
+
+    def replaceFile(self, temp_path: str, path: str):
+        # Replaces the file at path with the archive written to temp_path and reads the entries from it from then on.
+        # The archive is closed meanwhile, so it can be replaced even if it is the file the archive was opened from.
+        with self._lock:
+            self._zip_file.close()
+            try:
+                os.replace(temp_path, path)
+                self.path = path
+            finally:
+                self._zip_file = zipfile.ZipFile(self.path)
+
+    def close(self):
+        with self._lock:
+            self._zip_file.close()
+
+
+class SceneSnapshot:
+    """
+    Copy of the record of a scene and of the sources of its renditions, taken in the GUI thread. It is not
+    changed when the scene is edited, so a project can be serialised from it in the background.
+    """
+
+    def __init__(self, scene: Mv_Scene):
+        self.uuid = scene.uuid
+        self.record = scene.toJson()
+        self.renditions = scene.renditions
+        # QImages are implicitly shared, so this does not copy the pixel data
+        self.image = scene.pixmap.toImage() if type(scene.pixmap) is QtGui.QPixmap else None
+
+    def toJson(self, store_pixmap=False) -> dict:
+        json_dict = dict(self.record)
+        if store_pixmap:
+            encoded = self.encoded(MV_PREVIEW_SIZE)
+            if encoded is not None and encoded[1] == "png":
+                json_dict["pixmap"] = base64.b64encode(encoded[0]).decode('latin-1')
+            else:
+                json_dict["pixmap"] = jsonValFromImage(self.preview())
+        return json_dict
+
+    def preview(self) -> QtGui.QImage:
+        if self.image is not None:
+            return self.image
+        elif self.renditions is not None:
+            return self.renditions.preview()
+        return loadRenditions(self.record["source"], self.record["scene_type"], self.record["source_hash"])[0]
+
+    def encoded(self, size: int) -> tuple[bytes, str] | None:
+        # Prefer encoded renditions from the thumbnail cache or the project archive over encoding them again
+        source_hash = self.record["source_hash"]
+        encoded = thumbnail_cache.getEncoded(source_hash, size)
+        if encoded is None and self.renditions is not None:
+            encoded = self.renditions.encoded(size)
+        if encoded is not None:
+            return encoded
+
+        image = self.preview()
+        if image.isNull():
+            return None
+        if size != MV_PREVIEW_SIZE:
+            image = image.scaled(size, size,
+                                 QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                                 QtCore.Qt.TransformationMode.SmoothTransformation)
+        encoded = encodeImage(image)
+        if self.image is None:
+            # Keep renditions decoded from the project or the source in the cache, so they are not encoded again
+            # on the next save. Pixmaps of ingested scenes are cached by the ingest pipeline once they are final.
+            thumbnail_cache.putEncoded(source_hash, size, *encoded)
+        return encoded
+
+
+class JsonStreamReader:
+    """
+    Incremental reader for a JSON object in a text stream. The values of its keys are decoded one at a time and
+    the elements of a large array can be decoded one by one, so a project file is never decoded as a whole.
+    """
+
+    def __init__(self, stream, size=0, position=None, chunk_size=MV_LOAD_CHUNK_SIZE):
+        self.stream = stream
+        # Size of the underlying file and a callable returning the position in it, used to report progress
+        self.size = size
+        self.position = position
+        self.chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def progress(self) -> int:
+        if not self.size or self.position is None:
+            return 0
+        return min(100, self.position() * 100 // self.size)
+
+    def _read(self, size: int) -> bool:
+        chunk = self.stream.read(size)
+        if not chunk:
+            self._eof = True
+        # Drop the part of the buffer that has been decoded already
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return bool(chunk)
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read(self.chunk_size):
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(f"Expecting one of '{chars}'", self._buffer, self._pos)
+        self._pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # Values larger than the buffer double its size, so they are not decoded over and over again
+            self._read(max(self.chunk_size, len(self._buffer)))
+
+    def items(self, arrays=()):
+        # Yields the (key, value) pairs of the object, and one pair per element for the arrays with a key in arrays
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key in arrays and self._peek() == "[":
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        if self._expect(",]") == "]":
+                            break
+            else:
+                yield key, self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def elements(self, array_key: str, values: dict):
+        # Yields the elements of one array, the values of all other keys are stored in values as they are read
+        for key, value in self.items((array_key,)):
+            if key == array_key:
+                yield value
+            else:
+                values[key] = value
+
+
+def isProjectDatabase(path: str) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(16) == b"SQLite format 3\x00"
+    except OSError:
+        return False
+
+
+class ProjectDatabase:
+    """
+    Project store in a single SQLite file, for shows that are too large to be rewritten on every save.
+    The sequence fetches the scenes in batches in sequence order as they are shown, and their renditions are read
+    from the database on demand, like the entries of a project archive. A save of the open store only writes the
+    scenes that changed since they were loaded or saved, in a single transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS scenes (uuid TEXT PRIMARY KEY, source TEXT, source_hash TEXT,
+                                           capture_time INTEGER, record TEXT);
+        CREATE TABLE IF NOT EXISTS sequence (position INTEGER PRIMARY KEY, uuid TEXT);
+        CREATE TABLE IF NOT EXISTS bin (category TEXT, path TEXT, PRIMARY KEY (category, path));
+        CREATE TABLE IF NOT EXISTS ingest_index (path TEXT PRIMARY KEY, identity TEXT);
+        CREATE TABLE IF NOT EXISTS renditions (uuid TEXT, size INTEGER, extension TEXT, data BLOB,
+                                               PRIMARY KEY (uuid, size));
+        CREATE INDEX IF NOT EXISTS scenes_source_hash ON scenes (source_hash);
+        CREATE INDEX IF NOT EXISTS scenes_capture_time ON scenes (capture_time);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = self._connect()
+        # The state of the database as it was last loaded or saved. Only the UUIDs of the scenes are kept in sequence
+        # order, with the number of them that have been fetched by the sequence.
+        self._settings = {}
+        self._order = []
+        self._fetched = 0
+        self._bin = set()
+        self._index = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        # The connection is shared by the load and save workers and the icon loader threads
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.executescript(self.SCHEMA)
+        return connection
+
+    def read(self, name: str) -> bytes:
+        # Renditions are addressed like the entries of a project archive, e.g. "previews/<uuid>.jpg"
+        kind, _, file_name = name.partition("/")
+        size = MV_PREVIEW_SIZE if kind == "previews" else MV_ICON_SIZE
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM renditions WHERE uuid = ? AND size = ?",
+                                           (file_name.rpartition(".")[0], size)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return row[0]
+
+    def values(self) -> dict:
+        # Returns everything but the scenes, in the form of a project manifest
+        with self._lock:
+            connection = self._connection
+            self._settings = dict(connection.execute("SELECT name, value FROM settings"))
+            project_bin = {}
+            for category, path in connection.execute("SELECT category, path FROM bin ORDER BY rowid"):
+                project_bin.setdefault(category, []).append(path)
+                self._bin.add((category, path))
+            self._index = dict(connection.execute("SELECT path, identity FROM ingest_index"))
+            version = connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+            self._order = [scene_uuid for scene_uuid, in connection.execute(
+                "SELECT uuid FROM sequence ORDER BY position")]
+            self._fetched = 0
+            scene_count = len(self._order)
+
+        return {"version": int(version[0]) if version else 0,
+                "settings": json.dumps({name: json.loads(value) for name, value in self._settings.items()}),
+                "project_bin": project_bin,
+                "ingest_index": {path: json.loads(identity) for path, identity in self._index.items()},
+                "scene_count": scene_count}
+
+    def fetchScenes(self, count: int) -> list[dict]:
+        # Returns the records of the next scenes in sequence order, which have not been fetched yet
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT q.position, s.record FROM sequence q JOIN scenes s ON s.uuid = q.uuid "
+                "WHERE q.position >= ? ORDER BY q.position LIMIT ?", (self._fetched, count)).fetchall()
+            self._fetched = rows[-1][0] + 1 if len(rows) == count else len(self._order)
+        return [json.loads(record) for _, record in rows]
+
+    def unfetchedOrder(self) -> list[str]:
+        # The scenes that have not been fetched yet follow the fetched ones in the sequence
+        with self._lock:
+            return self._order[self._fetched:]
+
+    def sourceHashes(self) -> dict:
+        with self._lock:
+            return dict(self._connection.execute("SELECT source, source_hash FROM scenes WHERE source_hash != ''"))
+
+    def media(self) -> dict:
+        # Maps the source and audio source files of all scenes to their hashes, without loading the scenes
+        media = {}
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT source, source_hash, json_extract(record, '$.audio_source'), "
+                "json_extract(record, '$.audio_source_hash') FROM scenes").fetchall()
+        for source, source_hash, audio_source, audio_source_hash in rows:
+            media[source] = source_hash
+            if audio_source:
+                media[audio_source] = audio_source_hash or ""
+        return media
+
+    def save(self, snapshot: dict, progress_callback):
+        # The snapshot of a save to the open store has the order of all scenes and only the scenes that changed,
+        # otherwise it has all scenes in their order
+        order = snapshot.get("order")
+        if order is None:
+            order = [item.uuid.toString(QtCore.QUuid.StringFormat.WithoutBraces) for item in snapshot["scenes"]]
+        records = []
+        renditions = []
+        num_scenes = len(snapshot["scenes"])
+        for i, item in enumerate(snapshot["scenes"]):
+            scene_uuid = item.uuid.toString(QtCore.QUuid.StringFormat.WithoutBraces)
+            record = item.toJson()
+            if item.renditions is not None and item.renditions.archive is self and item.image is None:
+                # The renditions of scenes loaded from this database are in it already
+                record["preview"] = item.renditions.preview_entry
+                record["icon"] = item.renditions.icon_entry
+            else:
+                for key, size in (("preview", MV_PREVIEW_SIZE), ("icon", MV_ICON_SIZE)):
+                    encoded = item.encoded(size)
+                    if encoded is not None:
+                        data, extension = encoded
+                        record[key] = f"{key}s/{scene_uuid}.{extension}"
+                        renditions.append((scene_uuid, size, extension, data))
+            records.append((scene_uuid, *self.sceneColumns(record), json.dumps(record)))
+            progress_callback.emit((i + 1) * 100 // num_scenes)
+
+        settings = {name: json.dumps(value) for name, value in json.loads(snapshot["settings"]["settings"]).items()}
+        project_bin = {(category, path) for category, paths in snapshot["project_bin"]["project_bin"].items()
+                       for path in paths}
+        index = {path: json.dumps(identity) for path, identity in snapshot["ingest_index"]["ingest_index"].items()}
+
+        with self._lock, self._connection as connection:
+            removed = [(scene_uuid,) for scene_uuid in set(self._order).difference(order)]
+            connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(MV_PROJECT_FORMAT_VERSION),))
+            connection.executemany("INSERT OR REPLACE INTO scenes VALUES (?, ?, ?, ?, ?)", records)
+            connection.executemany("DELETE FROM scenes WHERE uuid = ?", removed)
+            connection.executemany("DELETE FROM renditions WHERE uuid = ?", removed)
+            connection.executemany("INSERT OR REPLACE INTO renditions VALUES (?, ?, ?, ?)", renditions)
+            if order != self._order:
+                # Positions are rewritten as a whole, which is cheap compared to the scene records
+                connection.execute("DELETE FROM sequence")
+                connection.executemany("INSERT INTO sequence VALUES (?, ?)", enumerate(order))
+            connection.executemany("INSERT OR REPLACE INTO settings VALUES (?, ?)",
+                                   [(name, value) for name, value in settings.items()
+                                    if self._settings.get(name) != value])
+            connection.executemany("DELETE FROM bin WHERE category = ? AND path = ?", self._bin - project_bin)
+            connection.executemany("INSERT INTO bin VALUES (?, ?)", project_bin - self._bin)
+            connection.executemany("DELETE FROM ingest_index WHERE path = ?",
+                                   [(path,) for path in self._index.keys() - index.keys()])
+            connection.executemany("INSERT OR REPLACE INTO ingest_index VALUES (?, ?)",
+                                   [(path, identity) for path, identity in index.items()
+                                    if self._index.get(path) != identity])
+
+            # The scenes that have not been fetched are at the end of the order before and after the save, also if
+            # some of them were fetched while the snapshot was saved
+            unfetched = len(self._order) - self._fetched
+            self._fetched = len(order) - unfetched
+            self._order = order
+
+        QtCore.qDebug(f"Updated {len(records)} and removed {len(removed)} scenes in {self.path}")
+        self._settings = settings
+        self._bin = project_bin
+        self._index = index
+
+    def sceneColumns(self, record: dict) -> tuple:
+        # Columns of the scenes table that are indexed, next to the complete record
+        return record["source"], record["source_hash"], captureTime(record.get("exif"))
+
+    def moveTo(self, path: str):
+        # Replaces the file at path with this database, e.g. after it has been written to a temporary file
+        with self._lock:
+            self._connection.close()
+            os.replace(self.path, path)
+            self.path = path
+            self._connection = self._connect()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class SceneRenditions:
+    """
+    Deferred handle for the preview and icon renditions of a scene loaded from a project. Renditions are read
+    from the project archive, the embedded pixmap of a legacy project or the thumbnail cache when they are
+    requested, and are regenerated from the source file as a last resort.
+    """
+
+    def __init__(self, source: str, scene_type: Scene_Type, source_hash="", archive=None,
+                 preview_entry="", icon_entry="", embedded_preview=b""):
+        self.source = source
+        self.scene_type = scene_type
+        self.source_hash = source_hash
+        self.archive = archive
+        self.preview_entry = preview_entry
+        self.icon_entry = icon_entry
+        self.embedded_preview = embedded_preview
+
+    def encoded(self, size: int) -> tuple[bytes, str] | None:
+        entry = self.preview_entry if size == MV_PREVIEW_SIZE else self.icon_entry
+        if self.archive is None or not entry:
+            return None
+        try:
+            return self.archive.read(entry), entry.rpartition(".")[2]
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile, sqlite3.Error) as e:
+            QtCore.qWarning(f"Failed to read {entry} from project archive {self.archive.path}: {e}")
+            return None
+
+    def preview(self) -> QtGui.QImage:
+        encoded = self.encoded(MV_PREVIEW_SIZE)
+        if encoded is not None:
+            image = QtGui.QImage.fromData(encoded[0])
+            if not image.isNull():
+                return image
+
+        if self.embedded_preview:
+            image = QtGui.QImage.fromData(self.embedded_preview, "PNG")
+            if not image.isNull():
+                return image.scaled(MV_PREVIEW_SIZE, MV_PREVIEW_SIZE,
+                                    QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                                    QtCore.Qt.TransformationMode.SmoothTransformation)
+
+        return loadRenditions(self.source, self.scene_type, self.source_hash)[0]
+
+    def icon(self) -> QtGui.QImage:
+        encoded = self.encoded(MV_ICON_SIZE)
+        if encoded is not None:
+            image = QtGui.QImage.fromData(encoded[0])
+            if not image.isNull():
+                return image
+
+        if not self.embedded_preview:
+            # Small cached icons can be used without decoding the preview
+            image = thumbnail_cache.get(self.source_hash, MV_ICON_SIZE)
+            if image is not None:
+                return image
+
+        return self.preview().scaled(MV_ICON_SIZE, MV_ICON_SIZE,
+                                     QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                                     QtCore.Qt.TransformationMode.SmoothTransformation)
+
+
+class IngestJob:
+    def __init__(self, index: int, path: str, mimetype: str, scene_type: Scene_Type):
+        self.index = index
+        self.path = path
+        self.file = os.path.basename(path)
+        self.mimetype = mimetype
+        self.scene_type = scene_type
+        # Set for files that have been ingested before, but changed since
+        self.replaces = False
+
+        # Filled in by the pipeline stages
+        self.identity = None
+        self.source_hash = ""
+        self.exif = None
+        self.image = None
+        self.icon = None
+        self.probe = None
+        self.embedded_preview = None
+        self.hash_future = None
+        self.refine = False
+        # The scene created from this job gets the UUID, so refined renditions can be matched to it later
+        self.uuid = QtCore.QUuid().createUuid()
+
+
+def compactExif(metadata: dict | None, tags=MV_EXIF_TAGS) -> dict | None:
+    # The keys are the interned tag names, so they are shared by the metadata of all scenes
+    if metadata is None:
+        return None
+    return {tag: metadata[tag] for tag in tags if tag in metadata}
+
+
+def captureTime(exif: dict | None) -> int | None:
+    # Milliseconds since the epoch. EXIF dates without a time zone are taken as UTC, like QuickTime dates.
+    if not exif:
+        return None
+    for date_tag, sub_second_tag, offset_tag in MV_CAPTURE_TIME_TAGS:
+        match = re.fullmatch(r"(\d{4}):(\d\d):(\d\d) (\d\d):(\d\d):(\d\d)(?:\.(\d+))?(Z|[+-]\d\d:\d\d)?",
+                             str(exif.get(date_tag, "")).strip())
+        if match is None:
+            continue
+        fraction = match.group(7) or str(exif.get(sub_second_tag, "") if sub_second_tag else "")
+        offset = match.group(8) or str(exif.get(offset_tag, "") if offset_tag else "")
+
+        time_zone = datetime.timezone.utc
+        offset_match = re.fullmatch(r"([+-])(\d\d):(\d\d)", offset or "")
+        if offset_match is not None:
+            delta = datetime.timedelta(hours=int(offset_match.group(2)), minutes=int(offset_match.group(3)))
+            time_zone = datetime.timezone(-delta if offset_match.group(1) == "-" else delta)
+        try:
+            date_time = datetime.datetime(*(int(value) for value in match.groups()[:6]), tzinfo=time_zone)
+        except ValueError:
+            # e.g. "0000:00:00 00:00:00", which cameras write when their clock was not set
+            continue
+
+        milliseconds = int((fraction + "00")[:3]) if fraction and fraction.isdigit() else 0
+        return int(date_time.timestamp()) * 1000 + milliseconds
+    return None
+
+
+@functools.lru_cache(maxsize=MV_METADATA_CACHE_SIZE)
+def readFullMetadata(path: str, source_hash="") -> dict | None:
+    # The source hash is part of the cache key, so the metadata of a changed file is read again
+    try:
+        with exiftool.ExifToolHelper() as helper:
+            return helper.get_metadata(path)[0]
+    except (exiftool.exceptions.ExifToolException, IndexError) as e:
+        QtCore.qWarning(f"Failed to read metadata from {path}: {e}")
+        return None
+
+
+class MetadataService:
+    """
+    Keeps a small pool of exiftool processes running for the duration of an import,
+    so metadata can be read in batches instead of starting a new process for every file.
+    Only the given tags are read; without tags, the complete metadata of the files is kept.
+    """
+
+    def __init__(self, processes=MV_METADATA_PROCESSES, batch_size=MV_METADATA_BATCH_SIZE, tags=MV_EXIF_TAGS):
+        self.batch_size = max(1, batch_size)
+        self.tags = tuple(sys.intern(tag) for tag in tags) if tags else None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, processes))
+        self._local = threading.local()
+        self._helpers = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _helper(self) -> exiftool.ExifToolHelper:
+        # Every thread of the executor talks to its own exiftool process
+        helper = getattr(self._local, "helper", None)
+        if helper is None:
+            helper = exiftool.ExifToolHelper()
+            self._local.helper = helper
+            with self._lock:
+                self._helpers.append(helper)
+        return helper
+
+    def _read(self, paths: list[str]) -> list[dict]:
+        helper = self._helper()
+        try:
+            metadata = self._readTags(helper, paths)
+        except exiftool.exceptions.ExifToolException:
+            metadata = []
+
+        if len(metadata) == len(paths):
+            return metadata
+
+        # A file in the batch could not be read, so read the files one by one to keep the results aligned
+        result = []
+        for path in paths:
+            try:
+                result.append(self._readTags(helper, [path])[0])
+            except (exiftool.exceptions.ExifToolException, IndexError):
+                QtCore.qWarning(f"Failed to read metadata from {path}")
+                result.append(None)
+        return result
+
+    def _readTags(self, helper: exiftool.ExifToolHelper, paths: list[str]) -> list[dict]:
+        if self.tags is None:
+            return helper.get_metadata(paths)
+        # exiftool only returns the requested tags, so large metadata blocks like maker notes are not decoded here
+        return [compactExif(metadata, self.tags) for metadata in helper.get_tags(paths, list(self.tags))]
+
+    def _readEmbeddedPreviews(self, paths: list[str]) -> list[bytes | None]:
+        helper = self._helper()
+        try:
+            # With -b, exiftool returns binary tags base64 encoded in its JSON output
+            tags = helper.get_tags(paths, ["ThumbnailImage", "PreviewImage"], params=["-b"])
+        except exiftool.exceptions.ExifToolException:
+            tags = []
+
+        if len(tags) != len(paths):
+            # Embedded previews are only a shortcut, so the files are not read again one by one
+            return [None] * len(paths)
+
+        result = []
+        for file_tags in tags:
+            # Prefer the small EXIF thumbnail, larger previews are only used if there is no thumbnail
+            values = sorted((not key.endswith(":ThumbnailImage"), value) for key, value in file_tags.items()
+                            if key.endswith(":ThumbnailImage") or key.endswith(":PreviewImage"))
+            value = values[0][1] if values else None
+            if isinstance(value, str) and value.startswith("base64:"):
+                result.append(base64.b64decode(value[7:]))
+            else:
+                result.append(None)
+        return result
+
+    def submit(self, paths: list[str]) -> concurrent.futures.Future:
+        return self._executor.submit(self._read, paths)
+
+    def submitEmbeddedPreviews(self, paths: list[str]) -> concurrent.futures.Future:
+        return self._executor.submit(self._readEmbeddedPreviews, paths)
+
+    def get_metadata(self, paths: list[str]) -> list[dict]:
+        result = []
+        for i in range(0, len(paths), self.batch_size):
+            result.extend(self.submit(paths[i:i + self.batch_size]).result())
+        return result
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            for helper in self._helpers:
+                if helper.running:
+                    helper.terminate()
+            self._helpers.clear()
+
+
+class CommitBatch:
+    """
+    Collects ingested jobs and hands them to a callback in batches, so the receiving models are updated
+    once per batch instead of once per file.
+    """
+
+    def __init__(self, callback, size=MV_COMMIT_BATCH_SIZE, interval=MV_COMMIT_INTERVAL):
+        self.callback = callback
+        self.size = size
+        self.interval = interval
+        self.jobs = []
+        self.timer = QtCore.QElapsedTimer()
+        self.timer.start()
+
+    def add(self, job: IngestJob):
+        self.jobs.append(job)
+        # Flush after an interval as well, so the first scenes appear while a large import is running
+        if len(self.jobs) >= self.size or self.timer.hasExpired(self.interval):
+            self.flush()
+
+    def flush(self):
+        if self.jobs:
+            self.callback(self.jobs)
+            self.jobs = []
+        self.timer.restart()
+
+
+class IngestPipeline:
+    """
+    Staged ingest engine: hashing and decoding fan out across a process pool, metadata is read
+    in batches by the metadata service and the results are handed to the commit callback in directory order.
+    The pipeline runs off the GUI thread, so it only produces QImages and plain data. Jobs are handed to the
+    callbacks in batches (see CommitBatch), which are expected to pass them on to the GUI thread.
+
+    With embedded previews, stills that are not in the thumbnail cache are committed with the preview
+    embedded in the file first. Their full quality renditions are handed to the refine callback later.
+    """
+
+    def __init__(self, workers=MV_INGEST_WORKERS, hash_mode=MV_HASH_MODE, embedded_previews=MV_EMBEDDED_PREVIEWS,
+                 exif_tags=MV_EXIF_TAGS):
+        self.workers = max(1, workers)
+        self.exif_tags = exif_tags
+        self.hash_mode = Hash_Mode(hash_mode)
+        self.embedded_previews = embedded_previews
+        self._pool = None
+
+    def pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is None:
+            # Use spawn instead of fork, because forking a process with running Qt threads is unsafe
+            self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers,
+                                                                mp_context=multiprocessing.get_context("spawn"))
+            QtCore.qInfo(f"Started ingest pool with {self.workers} worker processes")
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def run(self, jobs, commit, refine=None, progress_callback=None):
+        # Jobs are taken from an iterable, so files can be ingested while a directory is still being scanned
+        jobs = iter(jobs)
+        scanned = {}
+        num_scanned = 0
+        pool = self.pool()
+        embedded_previews = self.embedded_previews and refine is not None
+        # Limit the number of jobs in flight, so decoded images do not pile up in memory
+        window = self.workers * 4
+        hash_stage = {}
+        decode_stage = {}
+        metadata_stage = {}
+        hashed = decoding = 0
+        pending = []
+        committed = CommitBatch(commit)
+
+        with MetadataService(tags=self.exif_tags) as metadata:
+            batch_size = metadata.batch_size
+
+            for i in itertools.count():
+                # Scan ahead of the hash stage, so metadata batches can be filled
+                while num_scanned < i + 2 * window + batch_size:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    job.index = num_scanned
+                    scanned[num_scanned] = job
+                    num_scanned += 1
+                if i >= num_scanned:
+                    break
+
+                # Hashing runs ahead of decoding, because the content hash decides if decoding is needed at all
+                while hashed < min(i + 2 * window, num_scanned):
+                    hash_stage[hashed] = self.submitHash(pool, scanned[hashed])
+                    if hashed % batch_size == 0:
+                        paths = [scanned[k].path for k in range(hashed, min(hashed + batch_size, num_scanned))]
+                        metadata_stage[hashed] = (metadata.submit(paths),
+                                                  metadata.submitEmbeddedPreviews(paths) if embedded_previews else None,
+                                                  len(paths))
+                    hashed += 1
+
+                while decoding < min(i + window, num_scanned):
+                    ahead = scanned[decoding]
+                    try:
+                        self.takeMetadata(ahead, metadata_stage, batch_size)
+                        decode_stage[decoding] = self.submitDecode(pool, ahead, hash_stage.pop(decoding))
+                    except Exception as e:
+                        QtCore.qWarning(f"Failed to ingest {ahead.path}: {e}")
+                        decode_stage[decoding] = e
+                    decoding += 1
+
+                job = scanned.pop(i)
+                decode_future = decode_stage.pop(i)
+                try:
+                    if isinstance(decode_future, Exception):
+                        raise decode_future
+                    if job.refine:
+                        result = decodeEmbeddedPreview(job.embedded_preview, (job.exif or {}).get("EXIF:Orientation", 1))
+                        if result is None:
+                            # The embedded preview is not usable, so decode the file right away
+                            job.refine = False
+                            job.embedded_preview = None
+                            decode_future = self.submitDecode(pool, job, job.hash_future)
+                        else:
+                            self.takeImage(job, result, store=False)
+                    job.embedded_preview = None
+                    if decode_future is not None:
+                        self.takeImage(job, decode_future.result())
+                    if job.scene_type == Scene_Type.VIDEO and job.probe is None:
+                        QtCore.qDebug(f"Video file {job.path} does not contain a video stream")
+                        continue
+                    if job.image is None or job.icon is None:
+                        # Pillow could not decode the image, so let Qt's image plugins try
+                        job.image, job.icon = loadRenditions(job.path, job.scene_type, job.source_hash)
+                except Exception as e:
+                    QtCore.qWarning(f"Failed to ingest {job.path}: {e}")
+                else:
+                    committed.add(job)
+                    if job.refine:
+                        # The committed job belongs to the GUI thread now, so the refinement works on a copy
+                        pending.append(copy.copy(job))
+                finally:
+                    if progress_callback:
+                        progress_callback.emit(int((i + 1) * 100 / num_scanned))
+
+            committed.flush()
+
+        if pending:
+            QtCore.qInfo(f"Refining {len(pending)} embedded previews")
+            self.refineJobs(pool, pending, refine, progress_callback)
+
+        hash_memo.save()
+
+    def refineJobs(self, pool, jobs: list[IngestJob], refine, progress_callback=None):
+        # Generates the full quality renditions for scenes that were committed with their embedded preview
+        num_jobs = len(jobs)
+        window = self.workers * 4
+        decode_stage = {}
+        refined = CommitBatch(refine)
+
+        for i, job in enumerate(jobs):
+            for ahead in jobs[i + len(decode_stage):i + window]:
+                if not ahead.source_hash:
+                    self.takeHash(ahead, ahead.hash_future)
+                if self.takeCached(ahead):
+                    decode_stage[ahead.index] = None
+                else:
+                    decode_stage[ahead.index] = pool.submit(decodeStill, ahead.path)
+
+            decode_future = decode_stage.pop(job.index)
+            try:
+                if decode_future is not None:
+                    self.takeImage(job, decode_future.result())
+            except Exception as e:
+                QtCore.qWarning(f"Failed to decode {job.path}: {e}")
+            else:
+                if job.image is not None:
+                    refined.add(job)
+
+            if progress_callback:
+                progress_callback.emit(int((i + 1) * 100 / num_jobs))
+
+        refined.flush()
+
+    def takeMetadata(self, job: IngestJob, metadata_stage: dict, batch_size: int):
+        batch_start = job.index - job.index % batch_size
+        metadata_future, preview_future, count = metadata_stage[batch_start]
+        if job.index == batch_start + count - 1:
+            del metadata_stage[batch_start]
+
+        job.exif = metadata_future.result()[job.index - batch_start]
+        # Changed files replace existing scenes, so they are not refined later
+        if preview_future is not None and job.scene_type == Scene_Type.STILL and not job.replaces:
+            job.embedded_preview = preview_future.result()[job.index - batch_start]
+
+    def takeHash(self, job: IngestJob, hash_future):
+        try:
+            job.source_hash = hash_future.result()
+        except OSError as e:
+            QtCore.qWarning(f"Failed to hash {job.path}: {e}")
+        else:
+            if job.identity is not None:
+                hash_memo.put(job.path, job.source_hash, job.identity)
+
+    def takeCached(self, job: IngestJob) -> bool:
+        # Media that has been imported before is not decoded again, its renditions are taken from the cache
+        job.image = thumbnail_cache.get(job.source_hash, MV_PREVIEW_SIZE)
+        job.icon = thumbnail_cache.get(job.source_hash, MV_ICON_SIZE)
+        return job.image is not None and job.icon is not None
+
+    def takeImage(self, job: IngestJob, result, store=True):
+        if isinstance(result, VideoProbe):
+            job.probe = result
+            if job.identity is not None:
+                video_probes.put(job.path, job.identity, result)
+            result = result.image
+        if result is None:
+            return
+
+        job.image = imageFromDecodeResult(result)
+        job.icon = job.image.scaled(MV_ICON_SIZE, MV_ICON_SIZE,
+                                    QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                                    QtCore.Qt.TransformationMode.SmoothTransformation)
+        if store:
+            thumbnail_cache.put(job.source_hash, MV_PREVIEW_SIZE, job.image)
+            thumbnail_cache.put(job.source_hash, MV_ICON_SIZE, job.icon)
+
+    def submitHash(self, pool, job: IngestJob) -> concurrent.futures.Future:
+        if job.identity is None:
+            try:
+                job.identity = fileIdentity(job.path)
+            except OSError:
+                pass
+        if job.identity is not None:
+            source_hash = hash_memo.get(job.path, self.hash_mode, job.identity)
+            if source_hash is not None:
+                # The file has not changed since it was last hashed
+                future = concurrent.futures.Future()
+                future.set_result(source_hash)
+                return future
+
+        return pool.submit(hashFile, job.path, self.hash_mode)
+
+    def submitDecode(self, pool, job: IngestJob, hash_future) -> concurrent.futures.Future | None:
+        job.hash_future = hash_future
+        if job.embedded_preview is not None and not hash_future.done():
+            # Do not wait for the hash, the cache lookup and decoding are done when the scene is refined
+            job.refine = True
+            return None
+
+        self.takeHash(job, hash_future)
+        cached = self.takeCached(job)
+
+        if job.scene_type == Scene_Type.VIDEO:
+            if job.identity is not None:
+                job.probe = video_probes.get(job.path, job.identity, keyframe=not cached)
+            if job.probe is not None:
+                if cached:
+                    return None
+                future = concurrent.futures.Future()
+                future.set_result(job.probe)
+                return future
+            # Videos are always probed for their duration, but only decoded if the keyframe is not cached
+            return pool.submit(probeVideo, job.path, not cached)
+        elif cached:
+            return None
+        elif job.embedded_preview is not None:
+            job.refine = True
+            return None
+
+        return pool.submit(decodeStill, job.path)
+
+
 class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
+    # Ingest results are passed from the import worker to the GUI thread through these (queued) signals
+    ingest_committed = QtCore.pyqtSignal(list)
+    ingest_refined = QtCore.pyqtSignal(list)
+    bin_files_added = QtCore.pyqtSignal(str, list)
+
     def __init__(self):
         QtWidgets.QMainWindow.__init__(self)
         self.setupUi(self)
@@ -1061,6 +3727,44 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
         self.changes_saved = True
         self.supported_mime_types = get_supported_mime_types()
         self.scene_index = 0
+        self.ingest = IngestPipeline(workers=MV_INGEST_WORKERS, hash_mode=MV_HASH_MODE)
+        app.aboutToQuit.connect(self.ingest.shutdown)
+        app.aboutToQuit.connect(hash_memo.save)
+        self.media_source_directory = ""
+        self.import_running = False
+        self.import_queued = None
+        self.save_running = False
+        self.save_queued = False
+        self.save_mark = 0
+        self.save_dirty = set()
+        # Counts the changes of the project, so a save only clears the indicator if nothing changed while it ran
+        self.change_count = 0
+        self.save_change_count = 0
+        # Called when the project has been saved, e.g. to start a new project after saving the current one
+        self.after_save = None
+        self.journal = None
+        # Open project database of the current project, which is updated in place when the project is saved
+        self.project_store = None
+        # Open archive of the current project, which the scenes read their renditions from
+        self.project_archive = None
+        self.journalTimer = QtCore.QTimer(self)
+        self.journalTimer.setSingleShot(True)
+        self.journalTimer.setInterval(MV_JOURNAL_FLUSH_INTERVAL)
+        self.journalTimer.timeout.connect(self.flushJournal)
+        app.aboutToQuit.connect(self.closeJournal)
+        self.verify_mode = Verify_Mode(MV_VERIFY_MODE)
+        self.verify_cancel = threading.Event()
+        app.aboutToQuit.connect(lambda: self.verify_cancel.set())
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.scheduleWatchScan)
+        self.watchTimer = QtCore.QTimer(self)
+        self.watchTimer.setSingleShot(True)
+        self.watchTimer.setInterval(MV_WATCH_DEBOUNCE)
+        self.watchTimer.timeout.connect(self.scanWatchedDirectory)
+        self.checkBox_watchFolder.toggled.connect(self.watchMediaSourceDirectory)
+        self.ingest_committed.connect(self.commitIngestBatch)
+        self.ingest_refined.connect(self.refineIngestBatch)
+        self.bin_files_added.connect(self.project.bin.appendFiles)
 
         self.videoPreviewPlayer = QtMultimedia.QMediaPlayer(parent=self)
         self.videoPreviewPlayer.setVideoOutput(self.videoPreviewWidget)
@@ -1071,8 +3775,10 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
         self.videoTimer = QtCore.QTimer()
 
         sequence_model = self.mvshow.sequence
+        # The table shows the scenes matching the filter bar, the film strip always shows the whole show
+        self.scene_filter = SceneFilterProxyModel(sequence_model, self)
         self.listView_filmStrip.setModel(sequence_model)
-        self.tableView_scenes.setModel(sequence_model)
+        self.tableView_scenes.setModel(self.scene_filter)
         self.tableView_scenes.setSelectionMode(self.tableView_scenes.SelectionMode.ContiguousSelection)
         self.tableView_scenes.setSelectionBehavior(self.tableView_scenes.SelectionBehavior.SelectRows)
         self.tableView_scenes.setDragDropMode(self.tableView_scenes.DragDropMode.DragDrop)
@@ -1087,9 +3793,26 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
         self.tableView_scenes.setSortingEnabled(True)
 
         bin_model = self.project.clear_bin()
-        self.treeView.setModel(bin_model)
+        self.bin_filter = BinFilterProxyModel(bin_model, self)
+        self.treeView.setModel(self.bin_filter)
         self.treeView.header().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.ResizeToContents)
 
+        self.lineEdit_filter = QtWidgets.QLineEdit(parent=self.centralwidget)
+        self.lineEdit_filter.setObjectName("lineEdit_filter")
+        self.lineEdit_filter.setClearButtonEnabled(True)
+        self.lineEdit_filter.setPlaceholderText("Filter scenes and bin")
+        self.lineEdit_filter.setToolTip("Words are searched in file names, camera models, notes and audio sources. "
+                                        "Search a single field with name:, camera:, notes: or audio:, "
+                                        "filter by type:still, type:video or type:audio and by capture date with "
+                                        "date:2024, date:2024-05 or date:2024-05-01..2024-05-31.")
+        self.gridLayout.addWidget(self.lineEdit_filter, 10, 3, 1, 3)
+        self.filterTimer = QtCore.QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(MV_FILTER_DELAY)
+        self.filterTimer.timeout.connect(self.applyFilter)
+        self.lineEdit_filter.textChanged.connect(lambda: self.filterTimer.start())
+        self.lineEdit_filter.returnPressed.connect(self.applyFilter)
+
         self.threadpool = QtCore.QThreadPool().globalInstance()
         QtCore.qInfo("Multithreading with maximum %d threads" % self.threadpool.maxThreadCount())
         QtCore.qInfo("Supported media MIME types: %s" % self.supported_mime_types)
@@ -1105,18 +3828,33 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
 
         self.pushButton_mediaSourceDirectory.clicked.connect(self.sceneFromDirectoryDialog)
         self.pushButton_startShow.clicked.connect(self.openPresenterView)
-        self.mvshow.sequence.dataChanged.connect(self.changed)
+        self.mvshow.sequence.dataChanged.connect(self.sequenceDataChanged)
         self.mvshow.sequence.layoutChanged.connect(self.changed)
-        self.mvshow.sequence.rowsInserted.connect(self.changed)
+        self.mvshow.sequence.rowsMoved.connect(self.changed)
+        self.mvshow.sequence.rowsInserted.connect(self.sequenceRowsInserted)
         self.mvshow.sequence.rowsRemoved.connect(self.changed)
         self.project.settings.valueChanged.connect(self.changed)
+        self.mvshow.sequence.edited.connect(self.journalRecord)
+        self.project.settings.valueChanged.connect(
+            lambda name, value: self.journalRecord({"op": "setting", "name": name, "value": value}))
+        self.project.bin.files_added.connect(
+            lambda category, paths: self.journalRecord({"op": "bin", "category": category, "paths": paths}))
         self.mvshow.sequence.rowsRemoved.connect(self.showScenePreview)
         self.tableView_scenes.selectionModel().selectionChanged.connect(self.syncSelection)
         self.tableView_scenes.selectionModel().selectionChanged.connect(self.showScenePreview)
         self.listView_filmStrip.selectionModel().selectionChanged.connect(self.syncSelection)
         self.listView_filmStrip.selectionModel().selectionChanged.connect(self.showScenePreview)
         self.treeView.selectionModel().selectionChanged.connect(self.showBinPreview)
-        self.mvshow.sequence.rowsInserted.connect(self.tableView_scenes.resizeColumnsToContents)
+        self.mvshow.sequence.rowsInserted.connect(self.fitSceneColumns)
+        self.prefetchTimer = QtCore.QTimer(self)
+        self.prefetchTimer.setSingleShot(True)
+        self.prefetchTimer.setInterval(50)
+        self.prefetchTimer.timeout.connect(self.prefetchVisibleScenes)
+        self.listView_filmStrip.horizontalScrollBar().valueChanged.connect(lambda: self.prefetchTimer.start())
+        self.listView_filmStrip.verticalScrollBar().valueChanged.connect(lambda: self.prefetchTimer.start())
+        self.tableView_scenes.verticalScrollBar().valueChanged.connect(lambda: self.prefetchTimer.start())
+        self.mvshow.sequence.rowsInserted.connect(lambda: self.prefetchTimer.start())
+        self.mvshow.sequence.modelReset.connect(lambda: self.prefetchTimer.start())
         self.textEdit_notes.textChanged.connect(self.updateSceneNotes)
         self.actionNew.triggered.connect(self.newProject)
         self.actionOpen.triggered.connect(self.loadFromFile)
@@ -1124,6 +3862,25 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
         self.actionSave_As.triggered.connect(self.saveAsFileDialog)
         self.actionQuit.triggered.connect(self.quitProject, QtCore.Qt.ConnectionType.QueuedConnection)
 
+        self.actionCopyScenes = QtGui.QAction("Copy scenes", self)
+        self.actionCopyScenes.setShortcut(QtGui.QKeySequence.StandardKey.Copy)
+        self.actionCopyScenes.triggered.connect(self.copyScenes)
+        self.actionCutScenes = QtGui.QAction("Cut scenes", self)
+        self.actionCutScenes.setShortcut(QtGui.QKeySequence.StandardKey.Cut)
+        self.actionCutScenes.triggered.connect(self.cutScenes)
+        self.actionPasteScenes = QtGui.QAction("Paste scenes", self)
+        self.actionPasteScenes.setShortcut(QtGui.QKeySequence.StandardKey.Paste)
+        self.actionPasteScenes.triggered.connect(self.pasteScenes)
+        self.actionUndo = self.mvshow.sequence.undo_stack.createUndoAction(self, "Undo")
+        self.actionUndo.setShortcut(QtGui.QKeySequence.StandardKey.Undo)
+        self.actionRedo = self.mvshow.sequence.undo_stack.createRedoAction(self, "Redo")
+        self.actionRedo.setShortcut(QtGui.QKeySequence.StandardKey.Redo)
+        for action in (self.actionCopyScenes, self.actionCutScenes, self.actionPasteScenes,
+                       self.actionUndo, self.actionRedo):
+            action.setShortcutContext(QtCore.Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            self.tableView_scenes.addAction(action)
+            self.listView_filmStrip.addAction(action)
+
         self.spinBox_transitionTime.valueChanged.connect(
             lambda x: self.project.settings.setProperty("transition_time", x))
         self.spinBox_defaultDelay.valueChanged.connect(
@@ -1145,11 +3902,19 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
         self.quitProject()
 
     def newProject(self):
+        if self.save_running:
+            # The running save still reads from the open project files
+            self.saveRunningMessage("A new project can be started when the running save has finished")
+            return
         if self.changes_saved:
+            self.verify_cancel.set()
+            self.closeJournal()
             self.project.clear_bin()
+            self.project.ingest_index.clear()
+            self.checkBox_watchFolder.setChecked(False)
             self.mvshow.sequence.clear()
-            self.mvshow.sequence.__init__()
             self.save_file = None
+            self.closeProjectFiles()
             self.scene_index = 0
             self.resetProgressBar()
         else:
@@ -1157,7 +3922,7 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
 
             if answer == QtWidgets.QMessageBox.StandardButton.Save:
                 if self.saveToFile():
-                    self.newProject()
+                    self.after_save = self.newProject
                 else:
                     QtCore.qWarning("Could not save project.")
             elif answer == QtWidgets.QMessageBox.StandardButton.Discard:
@@ -1176,7 +3941,8 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
             answer = self.saveChangesDialog()
 
             if answer == QtWidgets.QMessageBox.StandardButton.Save:
-                self.saveToFile()
+                if self.saveToFile():
+                    self.after_save = app.quit
             elif answer == QtWidgets.QMessageBox.StandardButton.Discard:
                 self.changes_saved = True
                 self.radioButton_changes.setChecked(False)
@@ -1187,36 +3953,56 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
                 pass
 
     def saveAsFileDialog(self):
-        file_name = QtWidgets.QFileDialog.getSaveFileName(self, "Save project to file")[0]
+        file_name = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save project to file", "",
+            f"Qhawana project (*{MV_PROJECT_SUFFIX});;Qhawana project database (*{MV_DATABASE_SUFFIX});;"
+            f"Legacy Qhawana project (*{MV_LEGACY_PROJECT_SUFFIX})")[0]
         if file_name:
+            if not os.path.splitext(file_name)[1]:
+                file_name += MV_PROJECT_SUFFIX
             self.save_file = file_name
             self.saveToFile()
 
     def saveToFile(self):
         if self.save_file:
-            self.lockSequence()
+            if self.save_running:
+                # Saves are written one after the other, the queued save takes its snapshot when it starts
+                self.save_queued = True
+                return True
 
+            self.save_running = True
             self.progressBar.setEnabled(True)
             self.progressBar.setTextVisible(True)
 
-            worker = Worker(self.saveProjectToFile, self.save_file)
+            # The sequence stays editable, the worker serialises a snapshot of the project
+            self.save_mark = self.journal.records() if self.journal else 0
+            self.save_change_count = self.change_count
+            # The worker gets the open project files, it does not read or replace them on the window
+            worker = Worker(self.saveProjectToFile, self.save_file, self.projectSnapshot(self.save_file),
+                            self.project_archive, self.project_store)
             worker.signals.progress.connect(self.progressBar.setValue)
+            worker.signals.result.connect(self.saveSucceeded)
+            worker.signals.error.connect(self.saveFailed)
             worker.signals.finished.connect(self.resetProgressBar)
-            worker.signals.finished.connect(self.unlockSequence)
+            worker.signals.finished.connect(self.saveFinished)
             self.threadpool.start(worker)
 
-            self.changes_saved = True
-            self.radioButton_changes.setChecked(False)
-
             return True
         else:
             self.saveAsFileDialog()
 
     def loadFromFile(self, file_name=""):
+        if self.save_running:
+            self.saveRunningMessage("A project can be opened when the running save has finished")
+            return
         if self.changes_saved:
             if not file_name:
                 file_name = QtWidgets.QFileDialog.getOpenFileName(self, "Select project file")[0]
             if file_name:
+                self.verify_cancel.set()
+                self.closeJournal()
+                self.mvshow.sequence.undo_stack.clear()
+                self.closeProjectFiles()
                 self.lockSequence()
 
                 self.progressBar.setEnabled(True)
@@ -1225,7 +4011,9 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
                 worker = Worker(self.loadProjectFromFile, file_name)
                 worker.signals.progress.connect(self.progressBar.setValue)
                 worker.signals.finished.connect(self.resetProgressBar)
+                worker.signals.result.connect(self.recoverJournal)
                 worker.signals.finished.connect(self.unlockSequence)
+                worker.signals.finished.connect(self.verifyProjectMedia)
                 self.threadpool.start(worker)
 
                 self.changes_saved = True
@@ -1244,6 +4032,61 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
                 # In case the user selected "Cancel", do nothing:
                 pass
 
+    def closeProjectFiles(self):
+        # Scenes that still refer to a closed project file fall back to their cached or regenerated renditions
+        if self.project_archive is not None:
+            self.project_archive.close()
+            self.project_archive = None
+        if self.project_store is not None:
+            # The scenes of the show can no longer be fetched from the closed database
+            self.mvshow.sequence.setFetcher(None)
+            self.project_store.close()
+            self.project_store = None
+
+    def saveSucceeded(self, result: tuple):
+        file_name, store = result
+        if store is not None and store is not self.project_store:
+            # The project was saved to a new database, the scenes read their renditions from it from now on
+            if self.project_store is not None:
+                self.mvshow.sequence.rebindRenditions(self.project_store, store)
+                self.project_store.close()
+            self.project_store = store
+
+        # The journal only keeps the edits that were made while the project was saved
+        try:
+            if self.journal is None:
+                self.journal = ProjectJournal(file_name)
+                self.journal.open()
+            else:
+                self.journal.compact(self.save_mark, file_name)
+        except OSError as e:
+            QtCore.qWarning(f"Failed to write project journal: {e}")
+
+        # Changes that were made while the snapshot was written are saved with the next save
+        if self.change_count == self.save_change_count:
+            self.changes_saved = True
+            self.radioButton_changes.setChecked(False)
+
+    def saveRunningMessage(self, message: str):
+        QtCore.qWarning(message)
+        self.statusbar.showMessage(message, MV_STATUS_MESSAGE_TIMEOUT)
+
+    def saveFinished(self):
+        self.save_running = False
+        if self.save_queued:
+            self.save_queued = False
+            self.saveToFile()
+        elif self.after_save is not None and self.changes_saved:
+            after_save, self.after_save = self.after_save, None
+            after_save()
+
+    def saveFailed(self, error):
+        QtCore.qWarning(f"Failed to save project to {self.save_file}: {error[1]}")
+        # The scenes that were not saved are written with the next save
+        self.mvshow.sequence.markDirty(self.save_dirty)
+        self.after_save = None
+        self.changed()
+
     def saveChangesDialog(self):
         popup = QtWidgets.QMessageBox(self)
         popup.setIcon(QtWidgets.QMessageBox.Icon.Warning)
@@ -1258,23 +4101,105 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
 
         return answer
 
-    def saveProjectToFile(self, file_name, progress_callback):
-        with gzip.open(self.save_file, 'wt', encoding='ascii') as f:
-            settings = self.project.settings.toJson()
-            project_bin = self.project.bin.toJson(progress_callback)
-            show = self.mvshow.toJson(progress_callback)
-            json.dump(settings | project_bin | show, f)
+    def projectSnapshot(self, file_name: str) -> dict:
+        # Settings, bin and index are copied as plain data, the scenes as SceneSnapshots
+        snapshot = {"settings": self.project.settings.toJson(),
+                    "project_bin": self.project.bin.toJson(None),
+                    "ingest_index": self.project.ingest_index.toJson()}
+        sequence = self.mvshow.sequence
+        self.save_dirty = sequence.takeDirtyScenes()
+        store = self.project_store
+        if store is not None and store.path == file_name:
+            # The open project database only needs the order of the scenes and the ones that have changed,
+            # the scenes that have not been fetched yet are still in the database
+            snapshot["order"] = sequence.sceneOrder() + store.unfetchedOrder()
+            snapshot["scenes"] = [SceneSnapshot(scene) for scene in map(sequence.sceneByUuid, self.save_dirty)
+                                  if scene is not None and sequence.rowOfScene(scene.uuid) >= 0]
+        else:
+            snapshot["scenes"] = self.mvshow.snapshot()
+        return snapshot
 
-    def loadProjectFromFile(self, file_name, progress_callback):
+    def saveProjectToFile(self, file_name, snapshot: dict, archive, store, progress_callback) -> tuple:
+        # Runs in a worker on a snapshot of the project. The file is written to a temporary file first and replaces
+        # the project file when it is complete. Returns the file name and the database the project is saved to.
+        if file_name.endswith(MV_DATABASE_SUFFIX):
+            return file_name, self.saveProjectToDatabase(file_name, snapshot, store, progress_callback)
+
+        temp_file_name = f"{file_name}.tmp"
+        try:
+            if file_name.endswith(MV_LEGACY_PROJECT_SUFFIX):
+                with gzip.open(temp_file_name, 'wt', encoding='ascii') as f:
+                    show = self.mvshow.toJson(snapshot["scenes"], progress_callback)
+                    json.dump(snapshot["settings"] | snapshot["project_bin"] | show | snapshot["ingest_index"], f)
+                os.replace(temp_file_name, file_name)
+            else:
+                self.saveProjectToArchive(temp_file_name, snapshot, progress_callback)
+                if archive is not None:
+                    # The renditions of the scenes are read from the new archive, which has the same entries
+                    archive.replaceFile(temp_file_name, file_name)
+                else:
+                    os.replace(temp_file_name, file_name)
+        except Exception:
+            if os.path.exists(temp_file_name):
+                os.remove(temp_file_name)
+            raise
+
+        return file_name, None
+
+    def saveProjectToDatabase(self, file_name, snapshot: dict, store, progress_callback) -> ProjectDatabase:
+        # The open project database is updated in place, a new one is written to a temporary file first
+        if store is not None and store.path == file_name:
+            store.save(snapshot, progress_callback)
+            return store
+
+        temp_file_name = f"{file_name}.tmp"
+        if os.path.exists(temp_file_name):
+            os.remove(temp_file_name)
+        store = ProjectDatabase(temp_file_name)
         try:
-            with gzip.open(file_name, 'r') as f:
-                json_string = json.load(f)
-        except gzip.BadGzipFile:
-            with open(file_name, 'r') as f:
-                json_string = json.load(f)
+            store.save(snapshot, progress_callback)
+            store.moveTo(file_name)
+        except Exception:
+            store.close()
+            if os.path.exists(temp_file_name):
+                os.remove(temp_file_name)
+            raise
+
+        return store
+
+    def saveProjectToArchive(self, file_name, snapshot: dict, progress_callback):
+        # Project archives are zip files with a JSON manifest and the scene renditions as separate entries
+        with zipfile.ZipFile(file_name, 'w') as archive:
+            manifest = {"format": "qhawana", "version": MV_PROJECT_FORMAT_VERSION}
+            show = self.mvshow.toArchive(snapshot["scenes"], archive, progress_callback)
+            archive.writestr("manifest.json",
+                             json.dumps(manifest | snapshot["settings"] | snapshot["project_bin"] | show |
+                                        snapshot["ingest_index"]),
+                             compress_type=zipfile.ZIP_DEFLATED)
 
+    def loadProjectFromFile(self, file_name, progress_callback):
+        store = None
         QtCore.qInfo(f"Loading project from file {file_name}")
 
+        # The scenes are loaded while the file is read, the other values are stored in json_string as they appear
+        json_string = {}
+        if isProjectDatabase(file_name):
+            # The database stays open, the scenes read their renditions from it on demand and saves update it
+            # and the sequence fetches its scenes in batches
+            store = ProjectDatabase(file_name)
+            json_string = store.values()
+            self.mvshow.fetchFrom(store)
+            source_hashes = store.sourceHashes()
+            QtCore.qDebug(f"Fetching {json_string["scene_count"]} scenes")
+        else:
+            loaded = self.loadScenesFromFile(file_name, json_string, progress_callback)
+            source_hashes = {scene.source: scene.source_hash for scene in loaded if scene.source_hash}
+            QtCore.qDebug(f"Loaded {len(loaded)} scenes")
+        self.project_store = store
+
+        if json_string.get("version", 0) > MV_PROJECT_FORMAT_VERSION:
+            QtCore.qWarning(f"Project file {file_name} was written by a newer version of Qhawana")
+
         if "settings" in json_string:
             QtCore.qDebug(f"Loading project settings {json_string["settings"]}")
             self.project.settings.fromJson(json_string["settings"])
@@ -1284,11 +4209,21 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
                 self.spinBox_transitionTime.setValue(self.project.settings.getProperty("transition_time"))
 
         if "project_bin" in json_string:
-            self.project.bin.fromJson(json_string["project_bin"])
+            self.project.bin.fromJson(json_string["project_bin"], source_hashes)
 
-        if "scenes" in json_string:
-            QtCore.qDebug(f"Loading {len(json_string["scenes"])} scenes")
-            self.mvshow.fromJson(json_string["scenes"], progress_callback)
+        if "ingest_index" in json_string:
+            self.project.ingest_index.fromJson(json_string["ingest_index"])
+        else:
+            # Projects saved without an index treat the files in their bin as ingested in their current state
+            self.project.ingest_index.clear()
+            for index, category in forEach(self.project.bin):
+                if not index:
+                    continue
+                for i, path in forEach(self.project.bin, index):
+                    try:
+                        self.project.ingest_index.put(path, fileIdentity(path))
+                    except OSError:
+                        pass
 
         QtCore.qInfo(f"Project loaded from file {file_name}")
 
@@ -1296,139 +4231,450 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
         self.changes_saved = True
         self.radioButton_changes.setChecked(False)
 
+    def loadScenesFromFile(self, file_name, json_string: dict, progress_callback) -> list:
+        if zipfile.is_zipfile(file_name):
+            # The archive stays open, the scenes read their renditions from it on demand
+            archive = ProjectArchive(file_name)
+            self.project_archive = archive
+            raw = archive.open("manifest.json")
+            stream = io.TextIOWrapper(raw, encoding='utf-8')
+            size = archive.size("manifest.json")
+        else:
+            archive = None
+            raw = open(file_name, 'rb')
+            size = os.path.getsize(file_name)
+            if raw.read(2) == b"\x1f\x8b":
+                raw.seek(0)
+                stream = io.TextIOWrapper(gzip.GzipFile(fileobj=raw), encoding='utf-8')
+            else:
+                raw.seek(0)
+                stream = io.TextIOWrapper(raw, encoding='utf-8')
+
+        with raw, stream:
+            reader = JsonStreamReader(stream, size, raw.tell)
+            scenes = reader.elements("scenes", json_string)
+            progress = lambda i: ((i + 1) * 100 // json_string["scene_count"] if json_string.get("scene_count")
+                                  else reader.progress())
+            return self.mvshow.fromJson(scenes, progress_callback, archive, progress)
+
     def sceneFromDirectoryDialog(self):
         dir_name = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Media Source Directory")
         if dir_name:
             self.textEdit_mediaSourceDirectory.setText(dir_name)
-            self.progressBar.setEnabled(True)
-            self.progressBar.setTextVisible(True)
-
-            worker = Worker(self.populateModelFromDirectory, dir_name)
-            worker.signals.progress.connect(self.progressBar.setValue)
-            worker.signals.finished.connect(self.resetProgressBar)
-            self.threadpool.start(worker)
-
-    def populateModelFromDirectory(self, dir_name, progress_callback):
-        directory = sorted(os.listdir(dir_name))
-        num_files = len(directory)
-
-        for index, file in enumerate(directory):
-            progress_callback.emit(int((index + 1) * 100 / num_files))
-
-            path = os.path.join(dir_name, file)
+            self.media_source_directory = dir_name
+            self.importDirectory(dir_name)
+            self.watchMediaSourceDirectory(self.checkBox_watchFolder.isChecked())
+
+    def importDirectory(self, dir_name, settle_time=0):
+        if self.import_running:
+            QtCore.qInfo(f"Import of {dir_name} is queued until the running import has finished")
+            self.import_queued = (dir_name, settle_time)
+            return
 
-            if os.path.isdir(path) or os.path.islink(path):
-                # TODO: Consider the option to work recursively and/or process symlinks
-                continue
+        self.import_running = True
+        self.progressBar.setEnabled(True)
+        self.progressBar.setTextVisible(True)
+
+        worker = Worker(self.populateModelFromDirectory, dir_name,
+                        recursive=self.checkBox_recursive.isChecked(), settle_time=settle_time)
+        worker.signals.progress.connect(self.progressBar.setValue)
+        worker.signals.result.connect(self.updateWatchedDirectories)
+        worker.signals.finished.connect(self.importFinished)
+        worker.signals.finished.connect(self.resetProgressBar)
+        worker.signals.finished.connect(self.completeSceneHashes)
+        self.threadpool.start(worker)
+
+    def importFinished(self):
+        self.import_running = False
+        if self.import_queued:
+            dir_name, settle_time = self.import_queued
+            self.import_queued = None
+            self.importDirectory(dir_name, settle_time)
+
+    def watchMediaSourceDirectory(self, enabled: bool):
+        # In watch mode, new files in the media source directory are ingested as they appear
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.watchTimer.stop()
+
+        if enabled and self.media_source_directory:
+            QtCore.qInfo(f"Watching {self.media_source_directory} for new files")
+            self.watcher.addPath(self.media_source_directory)
+            # Pick up files that have arrived since the last import
+            self.scheduleWatchScan()
+
+    def scheduleWatchScan(self, path=""):
+        # Restarting the timer debounces bursts of file system events into a single scan
+        if self.checkBox_watchFolder.isChecked() and self.media_source_directory:
+            self.watchTimer.start()
+
+    def scanWatchedDirectory(self):
+        self.importDirectory(self.media_source_directory, settle_time=MV_WATCH_SETTLE_TIME)
+
+    def updateWatchedDirectories(self, result):
+        directories, unsettled = result
+        if not self.checkBox_watchFolder.isChecked():
+            return
 
-            if os.path.isfile(path) and (
-                    path.endswith(".xmp") or
-                    path.endswith(".pmv")
-            ):
-                # We are not interested in certain files like XMP or our own project files
+        # Watch subdirectories as well, if they are imported recursively
+        watched = set(self.watcher.directories())
+        new_directories = [d for d in directories if d not in watched]
+        if new_directories:
+            self.watcher.addPaths(new_directories)
+
+        if unsettled:
+            # Files that were still being written are picked up by the next scan
+            QtCore.qDebug(f"{len(unsettled)} files are still being written")
+            self.scheduleWatchScan()
+
+    def populateModelFromDirectory(self, dir_name, progress_callback, recursive=False, settle_time=0):
+        QtCore.qInfo(f"Ingesting files from {dir_name} with {self.ingest.workers} workers")
+        directories = []
+        unsettled = []
+        self.ingest.run(self.scanDirectory(dir_name, recursive, settle_time, directories, unsettled),
+                        self.ingest_committed.emit, self.ingest_refined.emit, progress_callback)
+
+        return directories, unsettled
+
+    def scanDirectory(self, dir_name, recursive=False, settle_time=0, visited=None, unsettled=None):
+        # Yields ingest jobs for new or changed files while the directory is scanned.
+        # Files are yielded in name order per directory, subdirectories after the files of their parent.
+        # Files modified less than settle_time ms ago are skipped (and added to unsettled), as they may
+        # still be written to.
+        ingest_index = self.project.ingest_index
+        directories = [dir_name]
+        num_known = 0
+        scan_time = time.time_ns()
+
+        while directories:
+            directory = directories.pop()
+            if visited is not None:
+                visited.append(directory)
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                QtCore.qWarning(f"Failed to scan directory {directory}: {e}")
                 continue
 
-            mimetype, encoding = mimetypes.guess_type(path)
-
-            if mimetype is None:
-                QtCore.qWarning(f"Failed to get Mimetype for {file}.")
-                # TODO: Could there be cases where we would want to process
-                #  the file even if we don't know the MIME type?
-                continue
+            subdirectories = []
+            audio_files = []
 
-            if mimetype.startswith("image/"):
-                audiopath = ""
-                pixmap = QtGui.QPixmap(path)
-                # try:
-                #     pil_image = PIL.Image.open(path)
-                #     exif_tags = pil_image.getexif()
-                # except PIL.UnidentifiedImageError:
-                #     exif_tags = []
-
-                exif_data = exiftool.ExifToolHelper().get_metadata(path)[0]
-                scene = Mv_Scene(source=path,
-                                 audio_source=audiopath,
-                                 pixmap=pixmap.scaled(MV_PREVIEW_SIZE, MV_PREVIEW_SIZE,
-                                                      QtCore.Qt.AspectRatioMode.KeepAspectRatio,
-                                                      QtCore.Qt.TransformationMode.SmoothTransformation),
-                                 scene_type=Scene_Type.STILL,
-                                 exif=exif_data)
-                QtCore.qDebug(f"Adding image scene from file {path}")
+            for entry in entries:
+                path = entry.path
 
-                bin_item = QtGui.QStandardItem(file)
-                bin_item.setData(path, QtCore.Qt.ItemDataRole.UserRole)
-                bin_item.setDragEnabled(True)
-                bin_item.setDropEnabled(False)
+                if entry.is_symlink():
+                    # Symlinks are not followed, so a recursive scan can not loop or ingest files twice
+                    continue
 
-                parent = self.project.bin.findItems("STILLS", QtCore.Qt.MatchFlag.MatchExactly, 0)[0]
-                parent.appendRow(bin_item)
+                if entry.is_dir():
+                    if recursive:
+                        subdirectories.append(path)
+                    continue
 
-                QtCore.qDebug(f"Adding image file {path} to project bin")
-            elif mimetype.startswith("video/") and mimetype in self.supported_mime_types:
-                keyframe_image = getKeyframeFromVideo(path)
-                pixmap = QtGui.QPixmap().fromImage(keyframe_image)
+                if path.endswith((".xmp", MV_LEGACY_PROJECT_SUFFIX, MV_PROJECT_SUFFIX, MV_DATABASE_SUFFIX)):
+                    # We are not interested in certain files like XMP or our own project files
+                    continue
 
-                with av.open(path) as container:
-                    if len(container.streams.video) == 0:
-                        QtCore.qDebug(f"Video file {path} does not contain a video stream")
-                        continue
+                mimetype, encoding = mimetypes.guess_type(path)
 
-                    # Set scene's play_video_audio property to True if the video has an audio stream:
-                    play_video_audio = (len(container.streams.audio) > 0)
+                if mimetype is None:
+                    QtCore.qWarning(f"Failed to get Mimetype for {entry.name}.")
+                    # TODO: Could there be cases where we would want to process
+                    #  the file even if we don't know the MIME type?
+                    continue
 
-                    stream = container.streams.video[0]
-                    duration = int(stream.duration * stream.time_base * 1000)
-                    in_point = int(stream.start_time * stream.time_base * 1000)
-                    out_point = duration - in_point
+                if mimetype.startswith("image/"):
+                    scene_type = Scene_Type.STILL
+                elif mimetype.startswith("video/") and mimetype in self.supported_mime_types:
+                    scene_type = Scene_Type.VIDEO
+                elif mimetype.startswith("audio/"):
+                    scene_type = None
+                else:
+                    QtCore.qInfo(f"File {entry.name.encode("utf-8", "ignore")} ({mimetype}) is not supported.")
+                    # Files with MIME types that we do not understand will be ignored, so continue:
+                    continue
 
-                exif_data = exiftool.ExifToolHelper().get_metadata(path)[0]
-                scene = Mv_Scene(source=path,
-                                 pixmap=pixmap.scaled(MV_PREVIEW_SIZE, MV_PREVIEW_SIZE,
-                                                      QtCore.Qt.AspectRatioMode.KeepAspectRatio,
-                                                      QtCore.Qt.TransformationMode.SmoothTransformation),
+                try:
+                    identity = fileIdentity(path)
+                except OSError as e:
+                    QtCore.qWarning(f"Failed to stat {path}: {e}")
+                    continue
+
+                known = ingest_index.contains(path)
+                if known and ingest_index.get(path) == identity:
+                    num_known += 1
+                    continue
+                if settle_time and scan_time - identity[1] < settle_time * 1000000:
+                    if unsettled is not None:
+                        unsettled.append(path)
+                    continue
+
+                if scene_type is None:
+                    # Audio files are not processed, they are ingested when they are added to the bin
+                    ingest_index.put(path, identity)
+                    if not known:
+                        audio_files.append(path)
+                    # Audio items will only be added to the project bin, but no scene item will be created, so continue:
+                    continue
+
+                job = IngestJob(-1, path, mimetype, scene_type)
+                job.identity = identity
+                job.replaces = known
+                yield job
+
+            if audio_files:
+                self.bin_files_added.emit("AUDIO", audio_files)
+
+            # Visit the subdirectories in name order
+            directories.extend(reversed(subdirectories))
+
+        if num_known:
+            QtCore.qInfo(f"Skipped {num_known} files that have already been ingested")
+
+    def commitIngestBatch(self, jobs: list[IngestJob]):
+        # Runs in the GUI thread, so pixmaps are created and the models are updated here
+        scene_items = []
+        bin_files = {"STILLS": [], "VIDEO": []}
+        committed = jobs
+
+        changed = [job for job in jobs if job.replaces]
+        if changed:
+            updated = self.updateChangedScenes(changed)
+            jobs = [job for job in jobs if job.path not in updated]
+
+        for job in jobs:
+            pixmap = QtGui.QPixmap().fromImage(job.image)
+            icon_pixmap = QtGui.QPixmap().fromImage(job.icon)
+
+            if job.scene_type == Scene_Type.STILL:
+                scene = Mv_Scene(source=job.path,
+                                 pixmap=pixmap,
+                                 icon_pixmap=icon_pixmap,
+                                 scene_type=Scene_Type.STILL,
+                                 exif=job.exif,
+                                 source_hash=job.source_hash,
+                                 compute_hashes=not job.refine,
+                                 uuid=job.uuid)
+                QtCore.qDebug(f"Adding image scene from file {job.path}")
+                if not job.replaces:
+                    bin_files["STILLS"].append(job.path)
+            else:
+                probe = job.probe
+                scene = Mv_Scene(source=job.path,
+                                 pixmap=pixmap,
+                                 icon_pixmap=icon_pixmap,
                                  scene_type=Scene_Type.VIDEO,
-                                 exif=exif_data,
-                                 duration=duration,
-                                 in_point=in_point,
-                                 out_point=out_point,
-                                 play_video_audio=play_video_audio)
-                QtCore.qDebug(f"Adding video scene from file {path} with duration {duration} ms, "
-                              f"in point {in_point} ms and out point {out_point} ms")
-
-                bin_item = QtGui.QStandardItem(file)
-                bin_item.setData(path, QtCore.Qt.ItemDataRole.UserRole)
-
-                bin_item.setDragEnabled(True)
-                bin_item.setDropEnabled(False)
-
-                parent = self.project.bin.findItems("VIDEO", QtCore.Qt.MatchFlag.MatchExactly, 0)[0]
-                parent.appendRow(bin_item)
-
-                QtCore.qDebug(f"Adding video file {path} to project bin")
-            elif mimetype.startswith("audio/"):
-                bin_item = QtGui.QStandardItem(file)
-                bin_item.setData(path, QtCore.Qt.ItemDataRole.UserRole)
-                bin_item.setDragEnabled(True)
-                bin_item.setDropEnabled(False)
-
-                parent = self.project.bin.findItems("AUDIO", QtCore.Qt.MatchFlag.MatchExactly, 0)[0]
-                parent.appendRow(bin_item)
+                                 exif=job.exif,
+                                 duration=probe.duration,
+                                 in_point=probe.in_point,
+                                 out_point=probe.out_point,
+                                 play_video_audio=probe.has_audio,
+                                 source_hash=job.source_hash,
+                                 uuid=job.uuid)
+                QtCore.qDebug(f"Adding {probe.width}x{probe.height} {probe.codec} video scene from file {job.path} "
+                              f"with duration {probe.duration} ms, in point {probe.in_point} ms "
+                              f"and out point {probe.out_point} ms")
+                if not job.replaces:
+                    bin_files["VIDEO"].append(job.path)
+
+            scene_item = QtGui.QStandardItem(job.file)
+            scene_item.setData(scene)
+            scene_item.setDropEnabled(False)
+            scene_items.append(scene_item)
+
+        for category, paths in bin_files.items():
+            if paths:
+                self.project.bin.appendFiles(category, paths)
+
+        self.mvshow.sequence.appendScenes(scene_items)
+
+        # Files are only ingested once their scenes are committed, files that failed are processed again on the
+        # next scan
+        for job in committed:
+            self.project.ingest_index.put(job.path, job.identity)
+
+    def updateChangedScenes(self, jobs: list[IngestJob]) -> set:
+        # Files that changed since they were ingested update their existing scenes instead of adding new ones
+        sequence = self.mvshow.sequence
+        jobs_by_path = {job.path: job for job in jobs}
+        updated = set()
+
+        sequence.fetchAll()
+        for row in range(sequence.rowCount()):
+            scene = sequence.item(row)
+            job = jobs_by_path.get(scene.source) if scene else None
+            if job is None:
+                continue
 
-                QtCore.qDebug(f"Adding audio file {path} to project bin")
-                # Audio items will only be added to the project bin, but no scene item will be created, so continue:
+            QtCore.qDebug(f"Updating scene {row} from changed file {job.path}")
+            scene.pixmap = QtGui.QPixmap().fromImage(job.image)
+            scene.icon = QtGui.QIcon()
+            scene.icon.addPixmap(QtGui.QPixmap().fromImage(job.icon), QtGui.QIcon.Mode.Normal, QtGui.QIcon.State.Off)
+            scene.source_hash = job.source_hash
+            scene.exif = job.exif
+            scene.capture_time = captureTime(scene.exif)
+            if job.probe is not None:
+                scene.duration = job.probe.duration
+                scene.in_point = min(scene.in_point, job.probe.duration)
+                scene.out_point = min(scene.out_point, job.probe.duration)
+            sequence.sceneChanged(scene)
+            updated.add(job.path)
+        return updated
+
+    def refineIngestBatch(self, jobs: list[IngestJob]):
+        # Swaps the embedded previews of scenes for their full quality renditions
+        sequence = self.mvshow.sequence
+        rows = sequence.rowsOfScenes({job.uuid for job in jobs})
+
+        for job in jobs:
+            if job.uuid not in rows:
+                # The scene has been removed in the meantime
                 continue
-            else:
-                QtCore.qInfo(f"File {file.encode("utf-8", "ignore")} ({mimetype}) is not supported.")
-                # Files with MIME types that we do not understand will be ignored, so continue:
+            scene = sequence.item(rows[job.uuid])
+            scene.pixmap = QtGui.QPixmap().fromImage(job.image)
+            scene.icon = QtGui.QIcon()
+            scene.icon.addPixmap(QtGui.QPixmap().fromImage(job.icon), QtGui.QIcon.Mode.Normal, QtGui.QIcon.State.Off)
+            if job.source_hash and job.source_hash != scene.source_hash:
+                # The scene was committed before its file was hashed, the hash is saved and journaled as an edit
+                scene.source_hash = job.source_hash
+                sequence.sceneEdited(scene, "source_hash")
+
+        if rows:
+            sequence.dataChanged.emit(sequence.index(min(rows.values()), 0), sequence.index(max(rows.values()), 0),
+                                      [QtCore.Qt.ItemDataRole.DecorationRole])
+
+    def completeSceneHashes(self):
+        # Scenes that were imported with a quick id or loaded without a hash get their full hash in the background
+        scenes = [self.mvshow.sequence.item(r) for r in range(self.mvshow.length())]
+        scenes = [s for s in scenes
+                  if s and (not s.source_hash or hashModeFromValue(s.source_hash) == Hash_Mode.QUICK)]
+        if scenes:
+            QtCore.qInfo(f"Computing full hashes for {len(scenes)} scenes in the background")
+            worker = Worker(self.hashScenes, [(s.uuid, s.source, s.source_hash) for s in scenes])
+            worker.signals.result.connect(self.applySceneHashes)
+            self.threadpool.start(worker, -1)
+
+    def hashScenes(self, scenes: list, progress_callback) -> list:
+        hashes = []
+        for scene_uuid, source, source_hash in scenes:
+            try:
+                full_hash = hash_memo.fileHash(source, Hash_Mode.SHA1)
+            except OSError as e:
+                QtCore.qWarning(f"Failed to hash {source}: {e}")
                 continue
+            if source_hash:
+                thumbnail_cache.alias(source_hash, full_hash)
+            hashes.append((scene_uuid, source_hash, full_hash))
+
+        hash_memo.save()
+        return hashes
+
+    def applySceneHashes(self, hashes: list):
+        # The hashes are set in the GUI thread and journaled, so they are saved like any other change of a scene
+        sequence = self.mvshow.sequence
+        for scene_uuid, source_hash, full_hash in hashes:
+            scene = sequence.sceneByUuid(scene_uuid)
+            # Scenes that were updated from a changed file in the meantime keep their new hash
+            if scene is not None and scene.source_hash == source_hash:
+                scene.source_hash = full_hash
+                sequence.sceneEdited(scene, "source_hash")
+
+    def verifyProjectMedia(self):
+        # Checks the media files of a loaded project against their stored hashes without blocking the GUI
+        if self.verify_mode == Verify_Mode.TRUST:
+            return
 
-            scene_item = QtGui.QStandardItem(file)
-            scene_item.setData(scene)
-            scene_item.setDropEnabled(False)
-
-            self.mvshow.sequence.appendRow(scene_item)
+        media = {}
+        if self.project_store is not None and self.mvshow.sequence.canFetchMore():
+            # The scenes that have not been fetched are verified with the media stored in the project database
+            media = self.project_store.media()
+        for r in range(self.mvshow.length()):
+            scene = self.mvshow.sequence.item(r)
+            if scene:
+                media[scene.source] = scene.source_hash
+                if scene.audio_source:
+                    media[scene.audio_source] = scene.audio_source_hash
+
+        self.verify_cancel = threading.Event()
+        QtCore.qInfo(f"Verifying {len(media)} media files ({self.verify_mode.name.lower()})")
+        worker = Worker(self.verifyMedia, media, self.verify_mode == Verify_Mode.FULL, self.verify_cancel)
+        worker.signals.result.connect(self.showMediaSummary)
+        worker.signals.finished.connect(self.completeSceneHashes)
+        self.threadpool.start(worker, -1)
+
+    def verifyMedia(self, media: dict, full: bool, cancel: threading.Event, progress_callback):
+        missing = []
+        changed = []
+        for path, file_hash in media.items():
+            if cancel.is_set():
+                QtCore.qInfo("Media verification cancelled")
+                return None
+            try:
+                if not verifyMediaFile(path, file_hash, self.project.ingest_index.get(path), full):
+                    QtCore.qWarning(f"Media file {path} has changed since it was added to the project")
+                    changed.append(path)
+            except OSError as e:
+                QtCore.qWarning(f"Media file {path} is missing: {e}")
+                missing.append(path)
+
+        if full:
+            hash_memo.save()
+        return missing, changed
+
+    def showMediaSummary(self, result):
+        if result is None:
+            return
+        missing, changed = result
+        if not missing and not changed:
+            QtCore.qInfo("All media files of the project have been verified")
+            return
 
-        return True
+        popup = QtWidgets.QMessageBox(self)
+        popup.setIcon(QtWidgets.QMessageBox.Icon.Warning)
+        popup.setWindowTitle("Media verification")
+        popup.setText(f"{len(missing)} media files are missing and {len(changed)} have changed "
+                      f"since they were added to the project")
+        popup.setDetailedText("\n".join([f"Missing: {path}" for path in missing] +
+                                        [f"Changed: {path}" for path in changed]))
+        popup.setModal(False)
+        popup.show()
+
+    def prefetchVisibleScenes(self):
+        # Prefetch the icons of the visible rows and of one page before and after them
+        for view in (self.listView_filmStrip, self.tableView_scenes):
+            model = view.model()
+            rect = view.viewport().rect()
+            first = view.indexAt(rect.topLeft()).row()
+            last = view.indexAt(rect.bottomRight()).row()
+            if first < 0:
+                first = 0
+            if last < 0:
+                # The view is not filled up to the bottom right corner
+                last = min(model.rowCount(), first + MV_PREFETCH_LIMIT) - 1
+            margin = last - first + 1
+            if model is self.mvshow.sequence:
+                self.mvshow.sequence.prefetchIcons(first - margin, last + margin)
+                continue
+            # The rows of a filtered view can be anywhere in the sequence, so they are prefetched by their ranges
+            rows = sorted(model.mapToSource(model.index(row, 0)).row()
+                          for row in range(max(0, first - margin), min(last + margin + 1, model.rowCount())))
+            for first_row, last_row in rowRanges(rows):
+                self.mvshow.sequence.prefetchIcons(first_row, last_row)
+
+    def fitSceneColumns(self, parent: QtCore.QModelIndex, first: int, last: int):
+        # Only the longest text of each column of the inserted rows is measured, instead of all rows of the
+        # sequence. Columns are widened to fit it, but never narrowed.
+        view = self.tableView_scenes
+        header = view.horizontalHeader()
+        sequence = self.mvshow.sequence
+        for column in range(sequence.columnCount()):
+            row = max(range(first, last + 1), key=lambda r: len(sequence.displayText(r, column)))
+            # Rows that do not match the filter have no index in the table and are not measured
+            index = self.scene_filter.mapFromSource(sequence.index(row, column))
+            width = max(view.sizeHintForIndex(index).width(), header.sectionSizeHint(column))
+            if width > header.sectionSize(column):
+                header.resizeSection(column, width)
 
     def resetProgressBar(self):
         self.progressBar.setEnabled(False)
@@ -1444,6 +4690,7 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
         self.listView_filmStrip.setEnabled(True)
 
     def openPresenterView(self):
+        self.mvshow.sequence.fetchAll()
         if self.mvshow.length() > 0:
             self.pv = Ui_presenterView(parent=self)
             if len(self.screens) > 1:
@@ -1471,7 +4718,7 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
             self.pushButton_inPoint.setEnabled(False)
             self.pushButton_outPoint.setEnabled(False)
 
-            bin_item = self.project.bin.itemFromIndex(bin_index)
+            bin_item = self.project.bin.itemFromIndex(sourceIndex(bin_index))
             parent = bin_item.parent() if bin_item else None
 
             if parent:
@@ -1486,9 +4733,11 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
                     self.videoPreviewPlayer.stop()
                     self.videoPreviewPlayer.setSource(QtCore.QUrl())
 
+                    # Decode the image at the size of the preview label instead of its full resolution
+                    preview_size = max(self.label_mediaPreview.width(), self.label_mediaPreview.height())
+                    image = loadScaledImage(bin_item.data(QtCore.Qt.ItemDataRole.UserRole), preview_size)
                     self.label_mediaPreview.setPixmap(
-                        scalePixmapToWidget(self.label_mediaPreview,
-                                            QtGui.QPixmap(bin_item.data(QtCore.Qt.ItemDataRole.UserRole))))
+                        scalePixmapToWidget(self.label_mediaPreview, QtGui.QPixmap().fromImage(image)))
                 elif parent_type == "VIDEO":
                     self.stackedWidget_preview.setCurrentIndex(1)
                     self.pushButton_playPausePreview.setEnabled(True)
@@ -1511,10 +4760,11 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
         else:
             return
 
+        scene_index = sourceIndex(scene_index)
         if scene_index.isValid():
             QtCore.qDebug(f"Showing preview for row {scene_index.row()} "
-                          f"({len(self.mvshow.sequence._sequence)} items in list, "
-                          f"{len(self.mvshow.sequence._scenes)} scenes in show)")
+                          f"({self.mvshow.sequence.rowCount()} items in list, "
+                          f"{self.mvshow.sequence.sceneCount()} scenes in show)")
             scene: Mv_Scene = self.mvshow.sequence.item(scene_index.row())
 
             if scene:
@@ -1605,24 +4855,174 @@ class Ui_mainWindow(QtWidgets.QMainWindow, Ui_mainWindow_Qhawana):
 
         if len(indexes) > 0:
             for i in indexes:
+                i = sourceIndex(i)
                 if i.isValid():
                     selection.select(i, i)
-            if self.tableView_scenes.selectionModel().selection() != selection:
+            # The table selects rows of the filter proxy, scenes that do not match the filter are not selected in it
+            table_selection = self.scene_filter.mapSelectionFromSource(selection)
+            if self.tableView_scenes.selectionModel().selection() != table_selection:
                 # self.tableView_scenes.blockSignals(True)
-                self.tableView_scenes.selectionModel().select(selection, selection_flags)
+                self.tableView_scenes.selectionModel().select(table_selection, selection_flags)
                 # self.tableView_scenes.blockSignals(False)
             if self.listView_filmStrip.selectionModel().selection() != selection:
                 # self.listView_filmStrip.blockSignals(True)
                 self.listView_filmStrip.selectionModel().select(selection, selection_flags)
                 # self.listView_filmStrip.blockSignals(False)
 
+    def applyFilter(self):
+        self.filterTimer.stop()
+        text = self.lineEdit_filter.text()
+        if text.strip():
+            # Scenes that have not been fetched yet would not be found
+            self.mvshow.sequence.fetchAll()
+        self.scene_filter.setQuery(text)
+        self.bin_filter.setQuery(text)
+        if self.bin_filter.isFiltered():
+            # Matching files are shown in their expanded categories
+            self.treeView.expandAll()
+
     def updateSceneNotes(self):
         scene = self.mvshow.sequence.item(self.scene_index)
         if scene:
             scene_data = scene
-            scene_data.notes = self.textEdit_notes.toPlainText()
+            notes = self.textEdit_notes.toPlainText()
+            if notes != scene_data.notes:
+                scene_data.notes = notes
+                self.mvshow.sequence.sceneEdited(scene_data, "notes")
+
+    def selectedSceneRows(self) -> list[int]:
+        return selectedRows(self.tableView_scenes)
+
+    def copyScenes(self):
+        rows = self.selectedSceneRows()
+        if not rows:
+            return False
+        scenes = [self.mvshow.sequence.item(row) for row in rows]
+        QtWidgets.QApplication.clipboard().setMimeData(scenesToMimeData(scenes))
+        QtCore.qInfo(f"Copied {len(scenes)} scenes to the clipboard")
+        return True
+
+    def cutScenes(self):
+        if self.copyScenes():
+            self.mvshow.sequence.removeScenes(self.selectedSceneRows(), "Cut scenes")
+
+    def pasteScenes(self):
+        items = scenesFromMimeData(QtWidgets.QApplication.clipboard().mimeData())
+        if not items:
+            return
+        # Paste after the selected scenes, or at the end of the sequence
+        rows = self.selectedSceneRows()
+        sequence = self.mvshow.sequence
+        row = rows[-1] + 1 if rows else sequence.endRow()
+        sequence.undo_stack.push(InsertScenesCommand(sequence, row, [item.data() for item in items], "Paste scenes"))
+        QtCore.qInfo(f"Pasted {len(items)} scenes from the clipboard")
+
+    def journalRecord(self, record: dict):
+        if self.journal is not None:
+            self.journal.append(record)
+            if not self.journalTimer.isActive():
+                self.journalTimer.start()
+
+    def flushJournal(self):
+        if self.journal is None:
+            return
+        try:
+            self.journal.flush()
+        except OSError as e:
+            QtCore.qWarning(f"Failed to write project journal: {e}")
+
+        # The journal is compacted into the project file from time to time by saving it
+        if not self.save_running and (self.journal.records() >= MV_JOURNAL_COMPACT_RECORDS or
+                                      self.journal.records() and
+                                      self.journal.age.hasExpired(MV_JOURNAL_COMPACT_INTERVAL)):
+            QtCore.qInfo(f"Compacting project journal with {self.journal.records()} edits")
+            self.saveToFile()
+
+    def closeJournal(self):
+        # The journal is only kept if the project has unsaved changes, which are recovered when it is opened again
+        if self.journal is not None:
+            self.journalTimer.stop()
+            self.journal.close(remove=self.changes_saved)
+            self.journal = None
+
+    def recoverJournal(self):
+        if not self.save_file:
+            return
+        journal = ProjectJournal(self.save_file)
+        records = journal.read()
+        if records:
+            QtCore.qInfo(f"Recovering {len(records)} unsaved edits from {journal.path}")
+            self.replayJournal(records)
+            self.changed()
+        try:
+            journal.open(json.dumps(record) for record in records)
+        except OSError as e:
+            QtCore.qWarning(f"Failed to write project journal: {e}")
+            return
+        self.journal = journal
+
+    def replayJournal(self, records: list[dict]):
+        sequence = self.mvshow.sequence
+        sequence.fetchAll()
+        for record in records:
+            op = record.get("op")
+            if op == "append":
+                sequence.appendScenes([Mv_Scene.fromJson(s) for s in record["scenes"]])
+            elif op == "insert" and "scenes" in record:
+                sequence.insertScenes(record["row"], [Mv_Scene.fromJson(s) for s in record["scenes"]])
+            elif op == "insert":
+                # Journals of older versions have a record for each moved scene
+                scene_uuids = record["uuids"] if "uuids" in record else [record["uuid"]]
+                sequence.insertSceneRows(record["row"], [QtCore.QUuid(scene_uuid) for scene_uuid in scene_uuids])
+            elif op == "remove" and "rows" in record:
+                sequence.applyRemove(record["rows"])
+            elif op == "remove":
+                sequence.removeRows(record["row"], record["count"], QtCore.QModelIndex())
+            elif op == "move":
+                sequence.applyMove(record["rows"], record["row"])
+            elif op == "reorder":
+                sequence.reorderRows(record["rows"])
+            elif op == "sort":
+                sequence.sort(record["column"], QtCore.Qt.SortOrder.DescendingOrder if record["order"]
+                              else QtCore.Qt.SortOrder.AscendingOrder)
+            elif op == "set":
+                scene = sequence.sceneByUuid(QtCore.QUuid(record["uuid"]))
+                if scene is None:
+                    QtCore.qWarning(f"Scene {record["uuid"]} of journal record not found")
+                    continue
+                for name, value in record["values"].items():
+                    setattr(scene, name, value)
+                sequence.sceneChanged(scene)
+            elif op == "setting":
+                self.project.settings.setProperty(record["name"], record["value"])
+                if record["name"] == "transition_time":
+                    self.spinBox_transitionTime.setValue(record["value"])
+                elif record["name"] == "default_delay":
+                    self.spinBox_defaultDelay.setValue(record["value"])
+            elif op == "bin":
+                self.project.bin.appendFiles(record["category"], record["paths"])
+                # Files added by an import are in the ingest index of the saved project as well
+                for path in record["paths"]:
+                    try:
+                        self.project.ingest_index.put(path, fileIdentity(path))
+                    except OSError:
+                        pass
+        # Recovered edits are part of the project as it was opened, they cannot be undone
+        sequence.undo_stack.clear()
+
+    def sequenceDataChanged(self, top_left, bottom_right, roles=()):
+        # Icons that are loaded or refined in the background do not change the project
+        if roles and all(role == QtCore.Qt.ItemDataRole.DecorationRole for role in roles):
+            return
+        self.changed()
+
+    def sequenceRowsInserted(self):
+        # Rows that are fetched from the project database do not change the project
+        if not self.mvshow.sequence.fetching:
+            self.changed()
 
     def changed(self):
+        self.change_count += 1
         self.changes_saved = False
         self.radioButton_changes.setChecked(True)
 
@@ -1963,8 +5363,9 @@ class Ui_multiVisionShow(QtWidgets.QWidget, Ui_Form_multiVisionShow):
 
     def loadScene(self, scene: Mv_Scene):
         if scene.scene_type == Scene_Type.STILL:
-            pixmap = QtGui.QPixmap()
-            pixmap.load(scene.source)
+            # Decode the image at the size of the show window instead of its full resolution
+            show_size = max(self.graphicsView.width(), self.graphicsView.height())
+            pixmap = QtGui.QPixmap().fromImage(loadScaledImage(scene.source, show_size))
             self.videoPlayer.stop()
             self.videoPlayer.setSource(QtCore.QUrl())
 
@@ -2059,7 +5460,11 @@ class Ui_multiVisionShow(QtWidgets.QWidget, Ui_Form_multiVisionShow):
 
 
 if __name__ == "__main__":
+    # Required for the ingest worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
+
     app = QtWidgets.QApplication(sys.argv)
+    app.setApplicationName("Qhawana")
     ui = Ui_mainWindow()
 
     qtmodern.styles.dark(app)
@@ -232,6 +232,12 @@ class Ui_mainWindow_Qhawana(object):
         self.pushButton_mediaSourceDirectory.setSizePolicy(sizePolicy)
         self.pushButton_mediaSourceDirectory.setObjectName("pushButton_mediaSourceDirectory")
         self.gridLayout.addWidget(self.pushButton_mediaSourceDirectory, 2, 2, 1, 1)
+        self.checkBox_watchFolder = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.checkBox_watchFolder.setObjectName("checkBox_watchFolder")
+        self.gridLayout.addWidget(self.checkBox_watchFolder, 2, 0, 1, 1)
+        self.checkBox_recursive = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.checkBox_recursive.setObjectName("checkBox_recursive")
+        self.gridLayout.addWidget(self.checkBox_recursive, 2, 1, 1, 1)
         self.frame_settings = QtWidgets.QFrame(parent=self.centralwidget)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.MinimumExpanding, QtWidgets.QSizePolicy.Policy.MinimumExpanding)
         sizePolicy.setHorizontalStretch(0)
@@ -368,6 +374,10 @@ class Ui_mainWindow_Qhawana(object):
         self.textEdit_notes.setPlaceholderText(_translate("mainWindow_Qhawana", "Notes"))
         self.radioButton_changes.setText(_translate("mainWindow_Qhawana", "Changes"))
         self.pushButton_mediaSourceDirectory.setText(_translate("mainWindow_Qhawana", "browse..."))
+        self.checkBox_watchFolder.setToolTip(_translate("mainWindow_Qhawana", "Import new files from the media source directory as they appear"))
+        self.checkBox_watchFolder.setText(_translate("mainWindow_Qhawana", "Watch for new files"))
+        self.checkBox_recursive.setToolTip(_translate("mainWindow_Qhawana", "Import media from subdirectories as well"))
+        self.checkBox_recursive.setText(_translate("mainWindow_Qhawana", "Include subdirectories"))
         self.label_transitionTime.setText(_translate("mainWindow_Qhawana", "Transition time:"))
         self.label_defaultDelay.setText(_translate("mainWindow_Qhawana", "Default delay:"))
         self.spinBox_transitionTime.setSuffix(_translate("mainWindow_Qhawana", " ms"))